@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """ActiveMQ Python Sender - Async"""
 import sys
-import json
 import asyncio
 import time
 import stomp
@@ -13,7 +12,7 @@ sys.path.insert(0, str(repo_root / 'utils' / 'python'))
 
 from message_helpers import *
 from test_data_loader import load_test_data
-from stats_collector import MessageStats
+from stats_collector import MessageStats, write_report
 
 
 class AsyncReplyListener(stomp.ConnectionListener):
@@ -134,8 +133,7 @@ async def run():
     print(f"total_received: {stats.received_count}")
     print(f"duration_ms: {stats.get_duration_ms()}")
     
-    with open('logs/report.txt', 'a') as f:
-        f.write(json.dumps(report) + '\n')
+    write_report(report)
 
 
 def main():
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """gRPC Python Sender - Async"""
 import sys
-import json
 import asyncio
 import grpc
 from pathlib import Path
@@ -14,7 +13,7 @@ import messaging_pb2
 import messaging_pb2_grpc
 from message_helpers import *
 from test_data_loader import load_test_data
-from stats_collector import MessageStats
+from stats_collector import MessageStats, write_report
 
 
 async def send_message_task(stubs, item):
@@ -103,8 +102,7 @@ async def run(base_port, num_receivers):
     print(f"total_received: {stats.received_count}")
     print(f"duration_ms: {stats.get_duration_ms()}")
     
-    with open('logs/report.txt', 'a') as f:
-        f.write(json.dumps(report) + '\n')
+    write_report(report)
 
 
 def main():
@@ -23,14 +23,13 @@ async def message_handler(msg, receiver_id):
     """Handle incoming message."""
     request_str = msg.data
     
-    # Parse message
-    request_envelope = parse_envelope(request_str)
-    message_id = request_envelope.message_id
+    # The reply goes to msg.reply, so only message_id and target are needed
+    # from the request: the id is peeked and the ACK encoded from the raw bytes
+    message_id = peek_message_id(request_str) or ""
     print(f" [x] Received message {message_id}")
     
     # Create ACK
-    response = create_ack_from_envelope(request_envelope, str(receiver_id))
-    resp_str = serialize_envelope(response)
+    resp_str = serialize_ack_from_raw(request_str, str(receiver_id))
     
     # Send reply
     await msg.respond(resp_str)
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """NATS Python Sender - Sync"""
 import sys
-import json
 import nats
 import asyncio
 from pathlib import Path
@@ -12,7 +11,7 @@ sys.path.insert(0, str(repo_root / 'utils' / 'python'))
 
 from message_helpers import *
 from test_data_loader import load_test_data
-from stats_collector import MessageStats
+from stats_collector import MessageStats, write_report
 
 
 def main():
@@ -78,8 +77,7 @@ def main():
     print(f"total_received: {stats.received_count}")
     print(f"duration_ms: {stats.get_duration_ms()}")
     
-    with open('logs/report.txt', 'a') as f:
-        f.write(json.dumps(report) + '\n')
+    write_report(report)
 
 
 if __name__ == "__main__":
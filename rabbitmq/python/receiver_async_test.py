@@ -40,15 +40,16 @@ async def run(receiver_id):
                     setattr(response, 'async', True)
                     resp_str = serialize_envelope(response)
                     
-                    # Send reply
-                    await channel.default_exchange.publish(
-                        aio_pika.Message(
-                            body=resp_str,
-                            correlation_id=message.correlation_id,
-                            content_type='application/octet-stream'
-                        ),
-                        routing_key=message.reply_to
-                    )
+                    # Send reply (confirm-only senders do not ask for one)
+                    if message.reply_to:
+                        await channel.default_exchange.publish(
+                            aio_pika.Message(
+                                body=resp_str,
+                                correlation_id=message.correlation_id,
+                                content_type='application/octet-stream'
+                            ),
+                            routing_key=message.reply_to
+                        )
                 
                 if not running:
                     break
@@ -47,16 +47,17 @@ def main():
         response = create_ack_from_envelope(request_envelope, str(receiver_id))
         resp_str = serialize_envelope(response)
         
-        # Send reply
-        ch.basic_publish(
-            exchange='',
-            routing_key=properties.reply_to,
-            body=resp_str,
-            properties=pika.BasicProperties(
-                correlation_id=properties.correlation_id,
-                content_type='application/octet-stream'
+        # Send reply (confirm-only senders do not ask for one)
+        if properties.reply_to:
+            ch.basic_publish(
+                exchange='',
+                routing_key=properties.reply_to,
+                body=resp_str,
+                properties=pika.BasicProperties(
+                    correlation_id=properties.correlation_id,
+                    content_type='application/octet-stream'
+                )
             )
-        )
         ch.basic_ack(delivery_tag=method.delivery_tag)
 
     channel.basic_qos(prefetch_count=1)
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """RabbitMQ Python Sender - Sync"""
 import sys
-import json
+import time
 import pika
 from pathlib import Path
 
@@ -11,84 +11,187 @@ sys.path.insert(0, str(repo_root / 'utils' / 'python'))
 
 from message_helpers import *
 from test_data_loader import load_test_data
-from stats_collector import MessageStats
+from stats_collector import MessageStats, write_report
 
+# Per-message log lines are buffered and written out in chunks of this size
+LOG_FLUSH_EVERY = 1000
 
-def main():
+# How long to wait for each message's ACK (or publisher confirm) before
+# counting it as failed
+REPLY_TIMEOUT_S = 0.04
+
+
+def run(confirm_only=False):
     test_data = load_test_data()
     
     stats = MessageStats()
     stats.set_metadata({
         'service': 'RabbitMQ',
         'language': 'Python',
-        'async': False
+        'async': False,
+        'confirm_only': confirm_only
     })
     start_time = get_current_time_ms()
     
     print(f" [x] Starting transfer of {len(test_data)} messages...")
     
-    # Connect to RabbitMQ
-    connection = pika.BlockingConnection(pika.ConnectionParameters('localhost'))
-    channel = connection.channel()
+    log_buf = []
+    envelope = MessageEnvelope()
+    # Message currently awaiting its reply; messages are still sent one at a time
+    pending = {'index': 0, 'message_id': None, 'msg_start': 0, 'log_line': '', 'timer': None,
+               'delivery_tag': 0, 'returned': False}
+    channel = None
+    
+    # Routing keys and publish properties are built once, not per message
+    targets = {item.get('target', 0) for item in test_data}
+    queue_names = {target: f"test_queue_{target}" for target in targets}
+    # In confirm-only mode no reply is requested; the broker's publisher
+    # confirm stands in for the receiver's ACK
+    properties = pika.BasicProperties(
+        reply_to=None if confirm_only else 'amq.rabbitmq.reply-to',
+        content_type='application/octet-stream'
+    )
     
-    for item in test_data:
+    def flush_log():
+        if log_buf:
+            sys.stdout.write('\n'.join(log_buf) + '\n')
+            log_buf.clear()
+    
+    def send_next():
+        index = pending['index']
+        if index >= len(test_data):
+            pending['message_id'] = None
+            connection.close()
+            return
+        if index and index % LOG_FLUSH_EVERY == 0:
+            flush_log()
+        pending['index'] = index + 1
+        
+        item = test_data[index]
         message_id = extract_message_id(item)
         target = item.get('target', 0)
-        print(f" [x] Sending message {message_id} to target {target}...", end='', flush=True)
-        
-        queue_name = f"test_queue_{target}"
-        msg_start = get_current_time_ms()
+        pending['message_id'] = message_id
+        pending['log_line'] = f" [x] Sending message {message_id} to target {target}..."
+        pending['msg_start'] = time.perf_counter_ns()
         
-        # Declare reply queue
-        result = channel.queue_declare(queue='', exclusive=True)
-        callback_queue = result.method.queue
+        # Create and send protobuf message (envelope reused across iterations)
+        body = serialize_envelope(fill_data_envelope(envelope, item))
         
-        # Create and send protobuf message
-        envelope = create_data_envelope(item)
-        body = serialize_envelope(envelope)
-        
-        # Send message
+        # basic_publish encodes the properties immediately, so one instance
+        # is reused and only the correlation_id changes per message
+        properties.correlation_id = message_id
+        # With mandatory, an unroutable message comes back as basic.return
+        # (ahead of its confirm) instead of being silently dropped
+        pending['delivery_tag'] += 1
+        pending['returned'] = False
         channel.basic_publish(
             exchange='',
-            routing_key=queue_name,
+            routing_key=queue_names[target],
             body=body,
-            properties=pika.BasicProperties(
-                reply_to=callback_queue,
-                correlation_id=message_id,
-                content_type='application/octet-stream'
-            )
+            properties=properties,
+            mandatory=confirm_only
         )
+        pending['timer'] = connection.ioloop.call_later(REPLY_TIMEOUT_S, on_timeout)
+    
+    def on_reply(ch, method, properties, reply_body):
+        message_id = pending['message_id']
+        if properties.correlation_id != message_id:
+            # Late reply for a message that already timed out
+            return
+        connection.ioloop.remove_timeout(pending['timer'])
         
-        # Wait for reply with timeout
-        response_received = False
-        for method_frame, properties, reply_body in channel.consume(callback_queue, inactivity_timeout=0.04):
-            if method_frame:
-                # Got a response
-                resp_envelope = parse_envelope(reply_body)
-                if is_valid_ack(resp_envelope, message_id):
-                    msg_duration = get_current_time_ms() - msg_start
-                    stats.record_message(True, msg_duration)
-                    print(" [OK]")
-                    response_received = True
-                else:
-                    stats.record_message(False)
-                    print(" [FAILED] Invalid ACK")
-                    response_received = True
-                channel.cancel()
-                break
-            else:
-                # Timeout
-                channel.cancel()
-                break
+        resp_envelope = parse_envelope(reply_body)
+        if is_valid_ack(resp_envelope, message_id):
+            stats.record_message_ns(True, time.perf_counter_ns() - pending['msg_start'])
+            log_buf.append(pending['log_line'] + " [OK]")
+        else:
+            stats.record_message(False)
+            log_buf.append(pending['log_line'] + " [FAILED] Invalid ACK")
+        send_next()
+    
+    def on_return(ch, method, properties, body):
+        if properties.correlation_id == pending['message_id']:
+            pending['returned'] = True
+    
+    def on_confirm(frame):
+        if frame.method.delivery_tag < pending['delivery_tag']:
+            # Late confirm for a message that already timed out
+            return
+        connection.ioloop.remove_timeout(pending['timer'])
         
-        if not response_received:
+        if pending['returned']:
+            stats.record_message(False)
+            log_buf.append(pending['log_line'] + " [FAILED] Unroutable")
+        elif isinstance(frame.method, pika.spec.Basic.Ack):
+            stats.record_message_ns(True, time.perf_counter_ns() - pending['msg_start'])
+            log_buf.append(pending['log_line'] + " [OK]")
+        else:
             stats.record_message(False)
-            print(" [FAILED] Timeout")
+            log_buf.append(pending['log_line'] + " [FAILED] Nacked")
+        send_next()
+    
+    def on_timeout():
+        stats.record_message(False)
+        log_buf.append(pending['log_line'] + " [FAILED] Timeout")
+        send_next()
+    
+    def start_confirming():
+        # Publisher confirms replace the reply consumer; the first message is
+        # only sent once the broker has acknowledged Confirm.Select
+        channel.add_on_return_callback(on_return)
+        channel.confirm_delivery(on_confirm, callback=lambda frame: send_next())
+    
+    def start_consuming():
+        # Single persistent consumer on the direct reply-to pseudo-queue; the
+        # first message is only sent once the broker has confirmed it
+        channel.basic_consume(
+            queue='amq.rabbitmq.reply-to',
+            on_message_callback=on_reply,
+            auto_ack=True,
+            callback=lambda frame: send_next()
+        )
+    
+    def on_channel_open(ch):
+        nonlocal channel
+        channel = ch
+        # Pipeline the target queue declares: all are issued back to back and
+        # consuming starts once the last DeclareOk arrives (~1 RTT in total)
+        start = start_confirming if confirm_only else start_consuming
+        if not queue_names:
+            start()
+            return
+        outstanding = len(queue_names)
         
-        # Clean up reply queue
-        channel.queue_delete(queue=callback_queue)
+        def on_declared(frame):
+            nonlocal outstanding
+            outstanding -= 1
+            if outstanding == 0:
+                start()
+        
+        for queue_name in queue_names.values():
+            channel.queue_declare(queue=queue_name, callback=on_declared)
+    
+    def on_connection_open(conn):
+        conn.channel(on_open_callback=on_channel_open)
+    
+    def on_connection_open_error(conn, error):
+        print(f" [!] RabbitMQ connection failed: {error}")
+        conn.ioloop.stop()
     
-    connection.close()
+    def on_connection_closed(conn, reason):
+        conn.ioloop.stop()
+    
+    # Event-driven connection: one epoll-based ioloop drives the whole
+    # on_open -> channel -> consume -> send/reply chain
+    connection = pika.SelectConnection(
+        pika.ConnectionParameters('localhost'),
+        on_open_callback=on_connection_open,
+        on_open_error_callback=on_connection_open_error,
+        on_close_callback=on_connection_closed
+    )
+    connection.ioloop.start()
+    
+    flush_log()
     
     end_time = get_current_time_ms()
     stats.set_duration(start_time, end_time)
@@ -102,8 +205,17 @@ def main():
     print(f"total_received: {stats.received_count}")
     print(f"duration_ms: {stats.get_duration_ms()}")
     
-    with open('logs/report.txt', 'a') as f:
-        f.write(json.dumps(report) + '\n')
+    write_report(report)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--confirm-only', action='store_true',
+                        help='Rely on broker publisher confirms instead of receiver ACKs')
+    args = parser.parse_args()
+    
+    run(args.confirm_only)
 
 
 if __name__ == "__main__":
@@ -3,7 +3,7 @@
 Rebuild All Services Script
 
 This script rebuilds all C++ services and installs Python dependencies
-for the messaging services project. It generates a detailed JSON report
+for the messaging services project. It generates a detailed JSON Lines report
 that can be used to diagnose and fix build problems.
 
 Services covered:
@@ -12,29 +12,147 @@ Services covered:
 
 Usage:
     python3 rebuild_all_services.py [--clean] [--skip-cpp] [--skip-python] [--verbose]
+                                    [--jobs N] [--force] [--isolated-installs] [--json-report]
+                                    [--minimal-report]
 
 Options:
     --clean      Clean build directories before rebuilding
     --skip-cpp   Skip C++ builds
     --skip-python Skip Python dependency installation
     --verbose    Enable verbose output
+    --jobs N     Build up to N C++ services in parallel (default: CPU count)
+    --force      Rebuild C++ services even when their sources are unchanged
+    --isolated-installs Run one pip install per Python service instead of a
+                 single combined install
+    --json-report Also write the report as a single JSON document
+    --minimal-report Keep only error/warning output lines (last 100 per
+                 service) in the report
 """
 
 import subprocess
 import sys
 import os
+import re
 import json
 import time
 import argparse
+import hashlib
+import shlex
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Directory this script lives in; all service paths are relative to it
+REPO_ROOT = Path(__file__).resolve().parent
+
+# Per-service source fingerprints from the last successful build
+BUILD_CACHE_FILE = REPO_ROOT / ".rebuild_cache.json"
+
+# Sources shared by every C++ service (headers, helpers, protobuf schema)
+SHARED_CPP_SOURCES = ["utils/cpp", "utils/messaging.proto"]
+
+# Executables every C++ service is expected to produce in build/bin
+CPP_TEST_EXECUTABLES = ['sender_test', 'receiver_test', 'sender_async_test', 'receiver_async_test']
+
+# Directories never included in a source fingerprint
+FINGERPRINT_SKIP_DIRS = {"build", "__pycache__"}
+
+# Most recent output lines kept per service in the report
+MAX_OUTPUT_LINES = 2000
+
+# Output lines kept per service with --minimal-report
+MINIMAL_OUTPUT_LINES = 100
+
+# Output lines worth keeping with --minimal-report
+DIAGNOSTIC_LINE = re.compile(r'\b(error|warning|undefined reference|fatal)\b', re.IGNORECASE)
+
+# Bytes requested per os.read() on a command's output pipe
+READ_CHUNK_SIZE = 1 << 16
+
+
+def dump_json(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when it is installed."""
+    # default=list serializes the bounded output deques
+    if orjson is not None:
+        return orjson.dumps(obj, default=list)
+    return json.dumps(obj, separators=(',', ':'), default=list).encode()
+
+
+def load_build_cache() -> Dict[str, str]:
+    """Load the service -> source fingerprint cache (empty if missing/corrupt)."""
+    try:
+        with open(BUILD_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_build_cache(cache: Dict[str, str]) -> None:
+    """Persist the service -> source fingerprint cache."""
+    with open(BUILD_CACHE_FILE, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+def source_fingerprint(paths: List[str]) -> str:
+    """Hash the (relpath, mtime_ns, size) of every file under the given paths.
+    
+    Only stat() metadata is read, so an unchanged tree is fingerprinted in
+    milliseconds without opening any file.
+    """
+    entries = []
+    stack = list(paths)
+    while stack:
+        current = stack.pop()
+        try:
+            st = os.stat(current)
+        except OSError:
+            continue
+        if not os.path.isdir(current):
+            entries.append((current, st.st_mtime_ns, st.st_size))
+            continue
+        with os.scandir(current) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in FINGERPRINT_SKIP_DIRS and not entry.name.startswith('.'):
+                        stack.append(entry.path)
+                elif entry.is_file():
+                    st = entry.stat()
+                    entries.append((entry.path, st.st_mtime_ns, st.st_size))
+    entries.sort()
+    return hashlib.sha256(repr(entries).encode()).hexdigest()
 
 
 class BuildReport:
-    """Handles generation of the build report."""
+    """Handles generation of the build report.
+    
+    Each service build owns its own record (returned by ``start_service``) so
+    several builds can run concurrently; only the shared service list and the
+    summary counters are guarded by a lock.
+    
+    The report is streamed as JSON Lines: a metadata line, one line per
+    service written as soon as it completes, and a closing summary line.
+    Completed services keep only what the console summary needs in memory.
     
-    def __init__(self):
+    With ``minimal`` set, only diagnostic output lines (errors, warnings,
+    link failures) are kept, and at most MINIMAL_OUTPUT_LINES per service.
+    """
+    
+    def __init__(self, filename: Optional[str] = None, minimal: bool = False):
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            filename = f"logs/build_report_{timestamp}.jsonl"
+        self.filename = filename
+        self.minimal = minimal
         self.report = {
             "metadata": {
                 "timestamp": datetime.now().isoformat(),
@@ -52,79 +170,91 @@ class BuildReport:
                 "duration_seconds": 0
             }
         }
-        self.current_service = None
+        self._lock = threading.Lock()
+        self._file = open(filename, 'wb')
+        self._write_line({"type": "metadata", **self.report["metadata"]})
+    
+    def _write_line(self, record: Dict[str, Any]):
+        """Append one compact JSON record to the report file."""
+        self._file.write(dump_json(record) + b'\n')
+        self._file.flush()
     
-    def start_service(self, name: str, build_type: str, command: str, path: str):
-        """Start recording a service build."""
-        self.current_service = {
+    def start_service(self, name: str, build_type: str, command: str, path: str) -> Dict[str, Any]:
+        """Start recording a service build and return its record."""
+        service = {
             "name": name,
             "build_type": build_type,
             "command": command,
             "path": path,
             "status": "running",
             "start_time": datetime.now().isoformat(),
-            "output": [],
+            # Event times below are stored as monotonic offsets from this point
+            "_t0": time.monotonic(),
+            "output": deque(maxlen=MINIMAL_OUTPUT_LINES if self.minimal else MAX_OUTPUT_LINES),
             "executables": [],
             "errors": [],
             "warnings": [],
             "commands_executed": []
         }
-        self.report["services"].append(self.current_service)
-        self.report["summary"]["total_services"] += 1
+        with self._lock:
+            self.report["services"].append(service)
+            self.report["summary"]["total_services"] += 1
+        return service
     
-    def add_output(self, text: str):
-        """Add output to current service."""
-        if self.current_service:
-            self.current_service["output"].append({
-                "timestamp": datetime.now().isoformat(),
-                "text": text
-            })
+    def add_output(self, service: Dict[str, Any], text: str):
+        """Add a line of output to a service record."""
+        if not self.minimal or DIAGNOSTIC_LINE.search(text):
+            service["output"].append(text)
     
-    def add_warning(self, warning: str):
-        """Add a warning to current service."""
-        if self.current_service:
-            self.current_service["warnings"].append({
-                "timestamp": datetime.now().isoformat(),
-                "message": warning
-            })
+    def extend_output(self, service: Dict[str, Any], lines: List[str]):
+        """Add a batch of output lines to a service record."""
+        if self.minimal:
+            lines = [line for line in lines if DIAGNOSTIC_LINE.search(line)]
+        service["output"].extend(lines)
     
-    def add_error(self, error: str):
-        """Add an error to current service."""
-        if self.current_service:
-            self.current_service["errors"].append({
-                "timestamp": datetime.now().isoformat(),
-                "message": error
-            })
+    def offset(self, service: Dict[str, Any]) -> float:
+        """Seconds elapsed since the service started, to the millisecond."""
+        return round(time.monotonic() - service["_t0"], 3)
     
-    def set_executables(self, executables: List[str]):
+    def add_warning(self, service: Dict[str, Any], warning: str):
+        """Add a warning to a service record."""
+        service["warnings"].append({
+            "offset_s": self.offset(service),
+            "message": warning
+        })
+    
+    def add_error(self, service: Dict[str, Any], error: str):
+        """Add an error to a service record."""
+        service["errors"].append({
+            "offset_s": self.offset(service),
+            "message": error
+        })
+    
+    def set_executables(self, service: Dict[str, Any], executables: List[str]):
         """Set the list of executables created."""
-        if self.current_service:
-            self.current_service["executables"] = executables
-    
-    def complete_service(self, success: bool, exit_code: int = 0):
-        """Mark the current service as completed."""
-        if self.current_service:
-            self.current_service["status"] = "success" if success else "failed"
-            self.current_service["exit_code"] = exit_code
-            self.current_service["end_time"] = datetime.now().isoformat()
-            
-            # Calculate duration
-            if self.current_service.get("start_time") and self.current_service.get("end_time"):
-                start = datetime.fromisoformat(self.current_service["start_time"])
-                end = datetime.fromisoformat(self.current_service["end_time"])
-                self.current_service["duration_seconds"] = (end - start).total_seconds()
-            
+        service["executables"] = executables
+    
+    def complete_service(self, service: Dict[str, Any], success: bool, exit_code: int = 0,
+                         status: Optional[str] = None):
+        """Mark a service as completed (``status`` overrides success/failed)."""
+        service["status"] = status or ("success" if success else "failed")
+        service["exit_code"] = exit_code
+        service["end_time"] = datetime.now().isoformat()
+        service["duration_seconds"] = time.monotonic() - service.pop("_t0")
+        
+        with self._lock:
             if success:
                 self.report["summary"]["successful"] += 1
             else:
                 self.report["summary"]["failed"] += 1
-    
-    def save(self, filename: Optional[str] = None):
-        """Save the report to a JSON file."""
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            filename = f"logs/build_report_{timestamp}.json"
+            self._write_line({"type": "service", **service})
         
+        # The full record is on disk now; drop the bulky parts from memory
+        service["output"] = []
+        service["commands_executed"] = []
+    
+    def save(self) -> str:
+        """Write the closing summary line, close the report and return its path."""
         self.report["summary"]["end_time"] = datetime.now().isoformat()
         
         if self.report["summary"]["start_time"] and self.report["summary"]["end_time"]:
@@ -132,133 +262,243 @@ class BuildReport:
             end = datetime.fromisoformat(self.report["summary"]["end_time"])
             self.report["summary"]["duration_seconds"] = (end - start).total_seconds()
         
-        with open(filename, 'w') as f:
-            json.dump(self.report, f, indent=2)
+        with self._lock:
+            self._write_line({"type": "summary", **self.report["summary"]})
+            self._file.close()
         
-        return filename
+        return self.filename
+
+
+def jsonl_to_json(jsonl_path: str, json_path: Optional[str] = None) -> str:
+    """Convert a streamed build report into a single JSON document.
+    
+    Records are read and written one at a time, so the converted report is
+    never held in memory as a whole.
+    """
+    if json_path is None:
+        json_path = os.path.splitext(jsonl_path)[0] + ".json"
+    
+    summary = {}
+    first_service = True
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(jsonl_path, 'rb') as src, open(json_path, 'wb') as dst:
+        for line in src:
+            if not line.strip():
+                continue
+            record = loads(line)
+            record_type = record.pop("type", "service")
+            if record_type == "metadata":
+                # The metadata line always comes first in the stream
+                dst.write(b'{"metadata": ' + dump_json(record) + b',\n"services": [')
+            elif record_type == "summary":
+                summary = record
+            else:
+                dst.write(b'\n' if first_service else b',\n')
+                dst.write(dump_json(record))
+                first_service = False
+        dst.write(b'\n],\n"summary": ' + dump_json(summary) + b'}\n')
+    
+    return json_path
 
 
 class ServiceBuilder:
     """Builds services and records results."""
     
-    def __init__(self, report: BuildReport, verbose: bool = False):
+    def __init__(self, report: BuildReport, verbose: bool = False,
+                 build_cache: Optional[Dict[str, str]] = None):
         self.report = report
         self.verbose = verbose
+        # Source fingerprints of up-to-date services; None disables the gate
+        self.build_cache = build_cache
     
-    def run_command(self, cmd: str, cwd: str, timeout: int = 3600, stream: bool = True) -> tuple:
+    def run_command(self, service: Dict[str, Any], cmd: Union[str, List[str]], cwd: str, timeout: int = 3600,
+                    stream: bool = True, env: Optional[Dict[str, str]] = None) -> tuple:
         """
         Run a command and return the result.
         
         Args:
-            cmd: Command to run
+            service: Report record of the service the command belongs to
+            cmd: Command to run, as an argv list or a string split with shlex
+                (no shell is involved either way)
             cwd: Working directory
             timeout: Timeout in seconds
             stream: Whether to stream output in real-time
+            env: Environment for the child process (defaults to ours)
             
         Returns: (success: bool, exit_code: int, stdout: str, stderr: str)
+        where stdout holds at most the last MAX_OUTPUT_LINES lines.
         """
-        self.report.add_output(f"Running command: {cmd}")
-        self.report.add_output(f"Working directory: {cwd}")
+        if isinstance(cmd, str):
+            argv = shlex.split(cmd)
+        else:
+            argv, cmd = list(cmd), shlex.join(cmd)
+        self.report.add_output(service, f"Running command: {cmd}")
+        self.report.add_output(service, f"Working directory: {cwd}")
         # record the command executed for this service
-        if getattr(self.report, 'current_service', None) is not None and self.report.current_service is not None:
-            self.report.current_service.setdefault("commands_executed", []).append({
-                "timestamp": datetime.now().isoformat(),
-                "command": cmd,
-                "cwd": cwd
-            })
+        service["commands_executed"].append({
+            "offset_s": self.report.offset(service),
+            "command": cmd,
+            "cwd": cwd
+        })
+        
+        # subprocess only launches via posix_spawn (no fork of this process)
+        # when the program path is absolute, cwd is unset and close_fds is
+        # off; our own fds are non-inheritable anyway (PEP 446). The argv
+        # itself is left as recorded above
+        search_path = (env or os.environ).get("PATH")
+        argv[0] = shutil.which(argv[0], path=search_path) or argv[0]
+        if cwd and os.path.abspath(cwd) == os.getcwd():
+            cwd = None
         
         try:
+            # Exec the command directly rather than through /bin/sh
             process = subprocess.Popen(
-                cmd,
-                shell=True,
+                argv,
                 cwd=cwd,
+                env=env,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1  # Line buffered
+                close_fds=False,
+                bufsize=0
             )
             
-            stdout = ""
-            
             if stream:
-                # Stream output in real-time
+                # Stream output in bulk: each os.read() returns whatever the pipe
+                # holds (up to 64 KiB) and is split into lines in one pass
+                fd = process.stdout.fileno()
+                partial = b""
                 while True:
-                    line = process.stdout.readline()
-                    if line:
-                        stdout += line
-                        self.report.add_output(line.rstrip('\n'))
-                        if self.verbose:
-                            print(line, end='')
-                    elif process.poll() is not None:
+                    chunk = os.read(fd, READ_CHUNK_SIZE)
+                    if not chunk:
                         break
+                    *lines, partial = (partial + chunk).split(b"\n")
+                    if lines:
+                        self._record_lines(service, [line.decode(errors="replace") for line in lines])
+                if partial:
+                    self._record_lines(service, [partial.decode(errors="replace")])
+                process.stdout.close()
             else:
-                stdout, _ = process.communicate(timeout=timeout)
-                for line in stdout.strip().split('\n'):
-                    if line:
-                        self.report.add_output(f"[stdout] {line}")
+                output, _ = process.communicate(timeout=timeout)
+                self.report.extend_output(
+                    service,
+                    [f"[stdout] {line}" for line in output.decode(errors="replace").strip().split("\n") if line]
+                )
             
             exit_code = process.wait()
             success = exit_code == 0
+            # Only the last MAX_OUTPUT_LINES lines are retained
+            stdout = "\n".join(service["output"])
             if not success:
                 # capture last part of stdout as an error message
                 sample = stdout[-400:] if len(stdout) > 400 else stdout
-                self.report.add_error(f"Command exited with code {exit_code}: {cmd}\n{sample}")
+                self.report.add_error(service, f"Command exited with code {exit_code}: {cmd}\n{sample}")
             return success, exit_code, stdout, ""
             
         except subprocess.TimeoutExpired:
-            self.report.add_error(f"Command timed out after {timeout} seconds")
+            self.report.add_error(service, f"Command timed out after {timeout} seconds")
             return False, -1, "", "Timeout expired"
         except Exception as e:
-            self.report.add_error(f"Exception occurred: {str(e)}")
+            self.report.add_error(service, f"Exception occurred: {str(e)}")
             return False, -1, "", str(e)
     
+    def _record_lines(self, service: Dict[str, Any], lines: List[str]):
+        """Store a batch of command output lines and echo them if verbose."""
+        self.report.extend_output(service, lines)
+        if self.verbose:
+            prefix = f"[{service['name']}] "
+            print("\n".join(prefix + line for line in lines))
+    
     def find_executables(self, build_dir: str, patterns: List[str] = None) -> List[str]:
-        """Find executables in the build directory."""
-        executables = []
-        build_path = Path(build_dir)
-        
-        if not build_path.exists():
-            return executables
+        """Find executables in the build directory.
         
-        # Common test executable names
-        test_names = ['sender_test', 'receiver_test', 'sender_async_test', 'receiver_async_test']
+        One os.scandir walk matches entries by name, using the DirEntry stat
+        cache, and stops as soon as every wanted name has been found.
+        """
+        wanted = set(patterns or CPP_TEST_EXECUTABLES)
+        executables = []
+        stack = [build_dir]
         
-        for pattern in (patterns or test_names):
-            for exe in build_path.rglob(pattern):
-                if exe.is_file() and os.access(exe, os.X_OK):
-                    executables.append(str(exe))
+        while stack and wanted:
+            try:
+                it = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif (entry.name in wanted and entry.is_file()
+                          and entry.stat().st_mode & 0o111):
+                        executables.append(entry.path)
+                        wanted.discard(entry.name)
         
         return executables
     
-    def build_cpp_service(self, name: str, path: str, build_cmd: str = "make build") -> bool:
-        """Build a C++ service."""
-        self.report.start_service(name, "C++", build_cmd, path)
+    def build_cpp_service(self, name: str, path: str, build_cmd: str = "make build",
+                          jobs: Optional[int] = None) -> bool:
+        """Build a C++ service.
+        
+        ``jobs`` caps the parallelism of the service's own make/cmake build so
+        that several services can compile side by side without oversubscribing.
+        """
+        service = self.report.start_service(name, "C++", build_cmd, path)
+        build_dir = os.path.join(path, "build", "bin")
+        
+        # Incremental gate: skip make when no source changed since the last
+        # successful build and its executables are still in place
+        fingerprint = None
+        if self.build_cache is not None:
+            fingerprint = source_fingerprint([path] + SHARED_CPP_SOURCES)
+            expected = [os.path.join(build_dir, exe) for exe in CPP_TEST_EXECUTABLES]
+            if self.build_cache.get(name) == fingerprint and all(os.access(exe, os.X_OK) for exe in expected):
+                self.report.add_output(service, "Sources unchanged since last successful build; skipping make")
+                self.report.set_executables(service, expected)
+                self.report.complete_service(service, True, 0, status="cached")
+                return True
+        
+        env = None
+        if jobs:
+            env = os.environ.copy()
+            env["MAKEFLAGS"] = f"-j{jobs}"
+            env["CMAKE_BUILD_PARALLEL_LEVEL"] = str(jobs)
         
-        success, exit_code, stdout, stderr = self.run_command(build_cmd, path)
+        success, exit_code, stdout, stderr = self.run_command(service, build_cmd, path, env=env)
         
         if success:
+            if fingerprint is not None:
+                self.build_cache[name] = fingerprint
+            
             # Look for executables
-            build_dir = os.path.join(path, "build", "bin")
             executables = self.find_executables(build_dir)
             
             if executables:
-                self.report.set_executables(executables)
-                self.report.add_output(f"Found {len(executables)} executables")
+                self.report.set_executables(service, executables)
+                self.report.add_output(service, f"Found {len(executables)} executables")
             else:
-                self.report.add_warning("No executables found in build/bin directory")
+                self.report.add_warning(service, "No executables found in build/bin directory")
         
-        self.report.complete_service(success, exit_code)
+        self.report.complete_service(service, success, exit_code)
         return success
     
-    def install_python_deps(self, name: str, path: str, deps: List[str]) -> bool:
-        """Install Python dependencies for a service."""
-        # Use python3 -m pip for better cross-platform compatibility
-        cmd = f"python3 -m pip install {' '.join(deps)}"
-        self.report.start_service(name, "Python", cmd, path)
+    def install_python_deps(self, name: str, path: str, deps: List[str],
+                            requirements_files: List[str] = ()) -> bool:
+        """Install Python dependencies (and requirements files) with one pip call."""
+        # Use python3 -m pip for better cross-platform compatibility; as an argv
+        # list, specifiers such as "stomp.py>=8.0.0" reach pip unmangled
+        argv = ["python3", "-m", "pip", "install", "--disable-pip-version-check", "--no-input"]
+        argv.extend(deps)
+        for req_file in requirements_files:
+            argv.extend(["-r", os.path.abspath(req_file)])
+        service = self.report.start_service(name, "Python", shlex.join(argv), path)
+        
+        # Keep pip's own imports and any source builds from writing __pycache__
+        # (installed packages are still byte-compiled by pip itself)
+        env = os.environ.copy()
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
         
-        success, exit_code, stdout, stderr = self.run_command(cmd, path)
+        success, exit_code, stdout, stderr = self.run_command(service, argv, path, env=env)
         
-        self.report.complete_service(success, exit_code)
+        self.report.complete_service(service, success, exit_code)
         return success
 
 
@@ -334,7 +574,7 @@ def get_python_services() -> List[Dict[str, Any]]:
         {
             "name": "redis/python",
             "path": "redis/python",
-            "deps": ["redis"],
+            "deps": ["redis[hiredis]", "uvloop"],
             "requirements_file": None
         },
         {
@@ -376,7 +616,7 @@ def print_summary(report: BuildReport) -> None:
     print("-" * 70)
     
     for service in report.report["services"]:
-        status_icon = "✓" if service["status"] == "success" else "✗"
+        status_icon = "✓" if service["status"] in ("success", "cached") else "✗"
         print(f"{status_icon} {service['name']:30} [{service['build_type']:6}] - {service['status']}")
         
         if service["status"] == "failed" and service.get("errors"):
@@ -404,14 +644,31 @@ def main():
                         help="Skip Python dependency installation")
     parser.add_argument("--verbose", "-v", action="store_true",
                         help="Enable verbose output")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild C++ services even if their sources are unchanged")
+    parser.add_argument("--isolated-installs", action="store_true",
+                        help="Run a separate pip install per Python service")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="Number of C++ services to build in parallel (default: CPU count)")
+    parser.add_argument("--minimal-report", action="store_true",
+                        help="Keep only error/warning output lines (last 100 per service) in the report")
+    parser.add_argument("--json-report", action="store_true",
+                        help="Also convert the streamed JSONL report into a single JSON document")
     
     args = parser.parse_args()
     
+    # Service paths are relative to the repo root, so run from there. Only the
+    # combined pip install (cwd ".") then needs no cwd= and can be launched
+    # via posix_spawn; C++ builds and --isolated-installs pip runs keep their
+    # service directory as cwd and go through fork/exec
+    os.chdir(REPO_ROOT)
+    
     # Initialize report
-    report = BuildReport()
+    report = BuildReport(minimal=args.minimal_report)
     report.report["summary"]["start_time"] = datetime.now().isoformat()
     
-    builder = ServiceBuilder(report, args.verbose)
+    build_cache = None if args.force else load_build_cache()
+    builder = ServiceBuilder(report, args.verbose, build_cache)
     
     cpp_services = get_cpp_services()
     python_services = get_python_services()
@@ -429,64 +686,111 @@ def main():
         print("\n[INFO] Building C++ services...")
         print("-" * 50)
         
+        # The services are independent, so build them side by side and split
+        # the cores between them for each service's inner make/cmake jobs
+        cpu_count = os.cpu_count() or 1
+        workers = max(1, min(args.jobs or cpu_count, len(cpp_services)))
+        inner_jobs = max(1, cpu_count // workers)
+        
         for service in cpp_services:
-            total_services += 1
             print(f"\n[Building] {service['name']}...")
             print(f"  Path: {service['path']}")
-            print(f"  Command: {service['build_cmd']}")
-            print("-" * 50)
-            
-            success = builder.build_cpp_service(
-                service['name'],
-                service['path'],
-                service['build_cmd']
-            )
-            
-            if success:
-                completed += 1
-                print(f"  ✓ {service['name']} built successfully")
-            else:
-                failed += 1
-                print(f"  ✗ {service['name']} build failed")
+            print(f"  Command: {service['build_cmd']} (-j{inner_jobs})")
+        print("-" * 50)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    builder.build_cpp_service,
+                    service['name'],
+                    service['path'],
+                    service['build_cmd'],
+                    inner_jobs
+                ): service
+                for service in cpp_services
+            }
+            for future in as_completed(futures):
+                service = futures[future]
+                total_services += 1
+                if future.result():
+                    completed += 1
+                    print(f"  ✓ {service['name']} built successfully")
+                else:
+                    failed += 1
+                    print(f"  ✗ {service['name']} build failed")
+        
+        if build_cache is not None:
+            save_build_cache(build_cache)
     
     # Install Python dependencies
     if not args.skip_python:
         print("\n[INFO] Installing Python dependencies...")
         print("-" * 50)
         
-        for service in python_services:
+        if args.isolated_installs:
+            for service in python_services:
+                total_services += 1
+                
+                # Check if requirements file exists and use it
+                req_file = service.get("requirements_file")
+                if req_file and os.path.exists(req_file):
+                    deps, req_files = [], [req_file]
+                    deps_str = f"(from {req_file})"
+                else:
+                    deps, req_files = service['deps'], []
+                    deps_str = f"({', '.join(service['deps'])})"
+                
+                print(f"\n[Installing] {service['name']} {deps_str}...")
+                print(f"  Path: {service['path']}")
+                print("-" * 50)
+                
+                success = builder.install_python_deps(
+                    service['name'],
+                    service['path'],
+                    deps,
+                    req_files
+                )
+                
+                if success:
+                    completed += 1
+                    print(f"  ✓ {service['name']} dependencies installed")
+                else:
+                    failed += 1
+                    print(f"  ✗ {service['name']} dependency installation failed")
+        else:
+            # Resolve every service's dependencies in a single pip run so pip's
+            # startup and resolver cost is paid once
             total_services += 1
+            deps = set()
+            req_files = []
+            for service in python_services:
+                req_file = service.get("requirements_file")
+                if req_file and os.path.exists(req_file):
+                    req_files.append(req_file)
+                else:
+                    deps.update(service['deps'])
             
-            # Check if requirements file exists and use it
-            req_file = service.get("requirements_file")
-            if req_file and os.path.exists(req_file):
-                cmd = f"python3 -m pip install -r {req_file}"
-                deps_str = f"(from {req_file})"
-            else:
-                cmd = f"python3 -m pip install {' '.join(service['deps'])}"
-                deps_str = f"({', '.join(service['deps'])})"
-            
-            print(f"\n[Installing] {service['name']} {deps_str}...")
-            print(f"  Path: {service['path']}")
-            print(f"  Command: {cmd}")
+            names = ', '.join(service['name'] for service in python_services)
+            print(f"\n[Installing] {names}...")
+            print(f"  Packages: {', '.join(sorted(deps))}")
+            for req_file in req_files:
+                print(f"  Requirements: {req_file}")
             print("-" * 50)
             
-            success = builder.install_python_deps(
-                service['name'],
-                service['path'],
-                service['deps']
-            )
+            success = builder.install_python_deps("python (all services)", ".", sorted(deps), req_files)
             
             if success:
                 completed += 1
-                print(f"  ✓ {service['name']} dependencies installed")
+                print("  ✓ Python dependencies installed")
             else:
                 failed += 1
-                print(f"  ✗ {service['name']} dependency installation failed")
+                print("  ✗ Python dependency installation failed")
     
     # Save report
     report_filename = report.save()
     print(f"\n[INFO] Build report saved to: {report_filename}")
+    if args.json_report:
+        print(f"[INFO] JSON report saved to: {jsonl_to_json(report_filename)}")
     
     # Print summary
     print_summary(report)
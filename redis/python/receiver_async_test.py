@@ -4,6 +4,7 @@ import sys
 import signal
 import asyncio
 import redis.asyncio as redis
+from redis.utils import HIREDIS_AVAILABLE
 from pathlib import Path
 
 # Add utils to path
@@ -11,9 +12,13 @@ repo_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(repo_root / 'utils' / 'python'))
 
 from message_helpers import *
+from async_sender import run_async
 
 running = True
 
+# Upper bound on messages drained and acknowledged per pipelined round trip
+ACK_BATCH_SIZE = 32
+
 def signal_handler(sig, frame):
     global running
     running = False
@@ -26,23 +31,45 @@ async def run(receiver_id):
     await pubsub.subscribe(channel_name)
     
     print(f" [*] [ASYNC] Receiver {receiver_id} waiting for messages on {channel_name}")
+    if not HIREDIS_AVAILABLE:
+        print(" [!] hiredis not installed; Redis replies are parsed in pure Python")
     
     while running:
         try:
             message = await pubsub.get_message(timeout=0.1)
-            if message and message['type'] == 'message':
-                request_envelope = parse_envelope(message['data'])
-                message_id = request_envelope.message_id
-                print(f" [x] [ASYNC] Received message {message_id}")
-                
-                # Create ACK
-                response = create_ack_from_envelope(request_envelope, str(receiver_id))
-                setattr(response, 'async', True)
-                resp_str = serialize_envelope(response)
-                
-                # Send reply
-                if 'reply_to' in request_envelope.metadata:
-                    await r.publish(request_envelope.metadata['reply_to'], resp_str)
+            if not message or message['type'] != 'message':
+                continue
+            
+            # Drain whatever else is already buffered (without blocking) so a
+            # burst is acknowledged with a single pipelined round trip
+            batch = [message]
+            while len(batch) < ACK_BATCH_SIZE:
+                message = await pubsub.get_message(timeout=0.0)
+                if not message:
+                    break
+                if message['type'] == 'message':
+                    batch.append(message)
+            
+            async with r.pipeline(transaction=False) as pipe:
+                for message in batch:
+                    # A bad message is skipped on its own, so the ACKs already
+                    # queued for the rest of the batch still go out
+                    try:
+                        request_envelope = parse_envelope(message['data'])
+                        message_id = request_envelope.message_id
+                        print(f" [x] [ASYNC] Received message {message_id}")
+                        
+                        # Create ACK
+                        response = create_ack_from_envelope(request_envelope, str(receiver_id))
+                        setattr(response, 'async', True)
+                        resp_str = serialize_envelope(response)
+                        
+                        # Queue reply
+                        if 'reply_to' in request_envelope.metadata:
+                            pipe.publish(request_envelope.metadata['reply_to'], resp_str)
+                    except Exception as e:
+                        print(f"Error: {e}")
+                await pipe.execute()
         except Exception as e:
             print(f"Error: {e}")
             await asyncio.sleep(0.1)
@@ -61,7 +88,7 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    asyncio.run(run(args.id))
+    run_async(run(args.id))
 
 
 if __name__ == "__main__":
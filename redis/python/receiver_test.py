@@ -3,6 +3,7 @@
 import sys
 import signal
 import redis
+from redis.utils import HIREDIS_AVAILABLE
 import time
 from pathlib import Path
 
@@ -14,6 +15,9 @@ from message_helpers import *
 
 running = True
 
+# Upper bound on messages drained and acknowledged per pipelined round trip
+ACK_BATCH_SIZE = 32
+
 def signal_handler(sig, frame):
     global running
     running = False
@@ -35,22 +39,42 @@ def main():
     pubsub.subscribe(channel_name)
     
     print(f" [*] Receiver {receiver_id} waiting for messages on {channel_name}")
+    if not HIREDIS_AVAILABLE:
+        print(" [!] hiredis not installed; Redis replies are parsed in pure Python")
     
     while running:
         message = pubsub.get_message(timeout=0.1)
-        if message and message['type'] == 'message':
-            request_envelope = parse_envelope(message['data'])
-            message_id = request_envelope.message_id
-            print(f" [x] Received message {message_id}")
-            
-            # Create ACK
-            response = create_ack_from_envelope(request_envelope, str(receiver_id))
-            resp_str = serialize_envelope(response)
-            
-            # Send reply
-            if 'reply_to' in request_envelope.metadata:
-                r.publish(request_envelope.metadata['reply_to'], resp_str)
+        if not message or message['type'] != 'message':
+            continue
+        
+        # Drain whatever else is already buffered (without blocking) so a
+        # burst is acknowledged with a single pipelined round trip
+        batch = [message]
+        while len(batch) < ACK_BATCH_SIZE:
+            message = pubsub.get_message(timeout=0.0)
+            if not message:
+                break
+            if message['type'] == 'message':
+                batch.append(message)
+        
+        # The request and ACK envelopes only live for one message each, so
+        # they come from the shared free-list instead of being allocated
+        with r.pipeline(transaction=False) as pipe, \
+                borrow_envelope() as request_envelope, borrow_envelope() as response:
+            for message in batch:
+                parse_envelope(message['data'], request_envelope)
+                message_id = request_envelope.message_id
+                print(f" [x] Received message {message_id}")
+                
+                # Create ACK
+                create_ack_from_envelope(request_envelope, str(receiver_id), response)
+                resp_str = serialize_envelope(response)
                 
+                # Queue reply
+                if 'reply_to' in request_envelope.metadata:
+                    pipe.publish(request_envelope.metadata['reply_to'], resp_str)
+            pipe.execute()
+        
     print(f" [x] Receiver {receiver_id} shutting down")
     pubsub.close()
     r.close()
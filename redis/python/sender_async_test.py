@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 """Redis Python Sender - Async"""
+import os
 import sys
-import json
+import time
 import asyncio
 import redis.asyncio as redis
+from redis.utils import HIREDIS_AVAILABLE
 from pathlib import Path
 
 # Add utils to path
@@ -11,87 +13,109 @@ repo_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(repo_root / 'utils' / 'python'))
 
 from message_helpers import *
+from async_sender import run_async
 from test_data_loader import load_test_data
-from stats_collector import MessageStats
+from stats_collector import MessageStats, write_report
+from redis_helpers import make_async_pool, parser_name, async_wait_for_subscribers
 
 
-async def send_message_task(item):
-    """Send a single message asynchronously with its own connection."""
-    result = {'success': False, 'message_id': '', 'duration': 0, 'error': ''}
+# Give up on a message's ACK after this long (200ms - doubled for reliability)
+REPLY_TIMEOUT_S = 0.2
+
+# Messages published per pipelined round trip
+SEND_BATCH_SIZE = 64
+
+# Default upper bound on messages awaiting their ACK at any one time
+MAX_IN_FLIGHT = 256
+
+
+
+def ack_result(result, future, msg_start):
+    """Fill in one message's result from its (possibly unresolved) ACK future."""
+    if not future.done():
+        result['error'] = 'Timeout'
+        return result
+    try:
+        resp_data, received_at = future.result()
+    except asyncio.CancelledError:
+        result['error'] = 'Cancelled'
+        return result
+    if is_valid_ack_bytes(resp_data, result['message_id']):
+        result['duration_ns'] = received_at - msg_start
+        result['success'] = True
+    else:
+        result['error'] = 'Invalid ACK'
+    return result
+
+
+async def send_batch(r, batch, pending):
+    """Publish a batch of pre-serialized messages in one pipeline and wait for their ACKs.
     
-    # Each task gets its own Redis connection
-    r = None
-    pubsub = None
+    ACKs arrive on the sender's shared reply channel, where the reply reader
+    resolves the futures registered in pending under each message's id.
+    """
+    results = []
+    futures = []
+    loop = asyncio.get_running_loop()
     
     try:
-        message_id = extract_message_id(item)
-        result['message_id'] = message_id
-        target = item.get('target', 0)
+        # Each prebuilt body only gets the send time appended
+        stamp = envelope_timestamp_suffix()
         
-        channel_name = f"test_channel_{target}"
-        reply_channel = f"reply_channel_{message_id}"
-        
-        msg_start = get_current_time_ms()
-        
-        # Create dedicated connection for this task
-        r = redis.Redis(host='localhost', port=6379, db=0)
-        pubsub = r.pubsub()
-        
-        # Subscribe to reply channel
-        await pubsub.subscribe(reply_channel)
-        
-        # Create and send message
-        envelope = create_data_envelope(item)
-        envelope.metadata['reply_to'] = reply_channel
-        body = serialize_envelope(envelope)
-        
-        # Publish
-        await r.publish(channel_name, body)
-        
-        # Wait for reply with timeout
-        try:
-            while True:
-                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.01)
-                if message and message['type'] == 'message':
-                    try:
-                        resp_envelope = parse_envelope(message['data'])
-                        if is_valid_ack(resp_envelope, message_id):
-                            result['duration'] = get_current_time_ms() - msg_start
-                            result['success'] = True
-                            break
-                        else:
-                            # Ignore mismatched ACKs (usually late ACKs from previous messages)
-                            pass
-                    except Exception:
-                        pass
-                    
-                # Timeout check (200ms - doubled for reliability)
-                if (get_current_time_ms() - msg_start) > 200:
-                    result['error'] = 'Timeout'
-                    break
-        except Exception as e:
-            result['error'] = str(e)
+        async with r.pipeline(transaction=False) as pipe:
+            for message_id, channel_name, body in batch:
+                results.append({'success': False, 'message_id': message_id, 'duration_ns': 0, 'error': ''})
+                pipe.publish(channel_name, body + stamp)
+                
+                future = loop.create_future()
+                pending[message_id] = future
+                futures.append(future)
             
+            msg_start = time.perf_counter_ns()
+            await pipe.execute()
+        
+        # One timeout for the whole batch: a single timer instead of a
+        # wait_for wrapper per message; whatever is unresolved has timed out
+        await asyncio.wait(futures, timeout=REPLY_TIMEOUT_S)
+        return [ack_result(result, future, msg_start) for result, future in zip(results, futures)]
     except Exception as e:
-        result['error'] = str(e)
+        for result in results:
+            result['error'] = str(e)
+        return results
     finally:
-        # Clean up resources
-        if pubsub:
-            try:
-                await pubsub.unsubscribe(reply_channel)
-                await pubsub.aclose()
-            except:
-                pass
-        if r:
-            try:
-                await r.aclose()
-            except:
-                pass
-    
-    return result
+        for result in results:
+            pending.pop(result['message_id'], None)
 
 
-async def run():
+async def read_replies(pubsub, pending):
+    """Route ACKs from the shared reply channel to their waiting futures."""
+    try:
+        # listen() wakes only when a reply arrives; the run cancels this task
+        async for message in pubsub.listen():
+            if message['type'] != 'message':
+                continue
+            data = message['data']
+            # ACK ids are "ack_<original id>"; the id is peeked from the raw
+            # bytes, and the envelope is only parsed when that fails
+            message_id = peek_message_id(data)
+            if message_id is None:
+                try:
+                    message_id = parse_envelope(data).message_id
+                except Exception:
+                    continue
+            # Late ACKs for timed-out messages find no future and are dropped
+            future = pending.pop(message_id.removeprefix('ack_'), None)
+            if future is not None and not future.done():
+                # The raw ACK is validated by the batch with is_valid_ack_bytes;
+                # the arrival time is taken here, since the batch only looks
+                # at its futures once all of them resolve or time out
+                future.set_result((data, time.perf_counter_ns()))
+    finally:
+        for future in pending.values():
+            future.cancel()
+
+
+async def run(max_in_flight=MAX_IN_FLIGHT):
     test_data = load_test_data()
     
     stats = MessageStats()
@@ -103,17 +127,72 @@ async def run():
     start_time = get_current_time_ms()
     
     print(f" [x] Starting ASYNC transfer of {len(test_data)} messages...")
+    if not HIREDIS_AVAILABLE:
+        print(" [!] hiredis not installed; Redis replies are parsed in pure Python")
+    
+    # One connection pool and one reply channel for the whole run; replies
+    # are multiplexed back to their callers by message id.
+    # At most max_in_flight // SEND_BATCH_SIZE batches run at once, each on
+    # one pooled connection, plus the reply subscription's connection
+    max_batches = max(1, max_in_flight // SEND_BATCH_SIZE)
+    pool = make_async_pool(max_connections=max_batches + 1)
+    print(f" [x] Redis reply parser: {parser_name(pool)}")
+    r = redis.Redis(connection_pool=pool)
+    pubsub = r.pubsub()
+    reply_channel = f"reply_channel_{os.getpid()}_{id(pubsub):x}"
+    await pubsub.subscribe(reply_channel)
     
-    # Give receivers time to subscribe (Redis pub/sub doesn't queue messages)
-    await asyncio.sleep(0.5)
+    # message_id -> future awaiting that message's ACK
+    pending = {}
     
-    # Process concurrently - each task gets its own connection
-    tasks = [send_message_task(item) for item in test_data]
-    results = await asyncio.gather(*tasks)
+    # Every message is serialized exactly once, up front, with the reply
+    # channel already set; sends only restamp the timestamp
+    targets = {item.get('target', 0) for item in test_data}
+    channels = {target: f"test_channel_{target}".encode() for target in targets}
+    reply_metadata = {'reply_to': reply_channel}
+    envelope = MessageEnvelope()
+    prebuilt = [
+        (extract_message_id(item), channels[item.get('target', 0)],
+         serialize_envelope(fill_data_envelope(envelope, item, metadata=reply_metadata)))
+        for item in test_data
+    ]
+    reader = asyncio.create_task(read_replies(pubsub, pending))
+    
+    # Redis pub/sub doesn't queue messages, so wait until every target's
+    # receiver has subscribed instead of sleeping a fixed time
+    missing = await async_wait_for_subscribers(r, list(channels.values()))
+    if missing:
+        print(f" [!] No subscriber on {len(missing)} channel(s) after waiting: "
+              f"{', '.join(channel.decode() for channel in missing)}")
+    
+    try:
+        # Batches go out concurrently, each as a single pipelined publish, with
+        # the semaphore keeping in-flight messages bounded
+        sem = asyncio.Semaphore(max_batches)
+        
+        async def bounded_batch(batch):
+            async with sem:
+                return await send_batch(r, batch, pending)
+        
+        batches = await asyncio.gather(*[
+            bounded_batch(prebuilt[i:i + SEND_BATCH_SIZE])
+            for i in range(0, len(prebuilt), SEND_BATCH_SIZE)
+        ])
+        results = [result for batch in batches for result in batch]
+    finally:
+        reader.cancel()
+        try:
+            await reader
+        except asyncio.CancelledError:
+            pass
+        await pubsub.unsubscribe(reply_channel)
+        await pubsub.aclose()
+        await r.aclose()
+        await pool.disconnect()
     
     for result in results:
         if result['success']:
-            stats.record_message(True, result['duration'])
+            stats.record_message_ns(True, result['duration_ns'])
             print(f" [OK] Message {result['message_id']} acknowledged")
         else:
             stats.record_message(False)
@@ -129,12 +208,17 @@ async def run():
     print(f"total_received: {stats.received_count}")
     print(f"duration_ms: {stats.get_duration_ms()}")
     
-    with open('logs/report.txt', 'a') as f:
-        f.write(json.dumps(report) + '\n')
+    write_report(report)
 
 
 def main():
-    asyncio.run(run())
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max-in-flight', type=int, default=MAX_IN_FLIGHT,
+                        help='Maximum messages awaiting an ACK at once (rounded down to whole batches)')
+    args = parser.parse_args()
+    
+    run_async(run(args.max_in_flight))
 
 
 if __name__ == "__main__":
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 """Redis Python Sender - Sync"""
+import os
 import sys
-import json
 import time
-import redis
+from redis.utils import HIREDIS_AVAILABLE
 from pathlib import Path
 
 # Add utils to path
@@ -12,7 +12,14 @@ sys.path.insert(0, str(repo_root / 'utils' / 'python'))
 
 from message_helpers import *
 from test_data_loader import load_test_data
-from stats_collector import MessageStats
+from stats_collector import MessageStats, write_report
+from redis_helpers import make_redis, parser_name, wait_for_subscribers
+
+# Messages published per pipelined round trip
+SEND_BATCH_SIZE = 256
+
+# A batch stops waiting once no ACK has arrived for this long
+REPLY_TIMEOUT_S = 0.08
 
 
 def main():
@@ -27,64 +34,102 @@ def main():
     start_time = get_current_time_ms()
     
     print(f" [x] Starting transfer of {len(test_data)} messages...")
+    if not HIREDIS_AVAILABLE:
+        print(" [!] hiredis not installed; Redis replies are parsed in pure Python")
     
-    r = redis.Redis(host='localhost', port=6379, db=0)
+    r = make_redis()
+    print(f" [x] Redis reply parser: {parser_name(r.connection_pool)}")
     pubsub = r.pubsub(ignore_subscribe_messages=True)
     
-    for item in test_data:
-        message_id = extract_message_id(item)
-        target = item.get('target', 0)
-        print(f" [x] Sending message {message_id} to target {target}...", end='', flush=True)
-        
-        channel_name = f"test_channel_{target}"
-        reply_channel = f"reply_channel_{message_id}"
-        
-        msg_start = get_current_time_ms()
+    # One reply channel for the whole run, subscribed once; ACKs are matched
+    # to the message awaiting them by id
+    reply_channel = f"reply_channel_{os.getpid()}_{id(pubsub):x}"
+    pubsub.subscribe(reply_channel)
+    
+    # Every message is serialized exactly once, up front, with the reply
+    # channel already set; sends only restamp the timestamp
+    envelope = MessageEnvelope()
+    reply_metadata = {'reply_to': reply_channel}
+    # Channel names are formatted once per target, not once per message
+    targets = {item.get('target', 0) for item in test_data}
+    channels = {target: f"test_channel_{target}".encode() for target in targets}
+    prebuilt = [
+        (extract_message_id(item), channels[item.get('target', 0)],
+         serialize_envelope(fill_data_envelope(envelope, item, metadata=reply_metadata)))
+        for item in test_data
+    ]
+    
+    # Redis pub/sub doesn't queue messages, so wait once for every target's
+    # receiver to subscribe rather than retrying publishes nobody received
+    missing = wait_for_subscribers(r, list(channels.values()))
+    if missing:
+        print(f" [!] No subscriber on {len(missing)} channel(s) after waiting: "
+              f"{', '.join(channel.decode() for channel in missing)}")
+    
+    # message_id -> send time of every published message still awaiting its ACK
+    pending = {}
+    
+    for batch_start in range(0, len(prebuilt), SEND_BATCH_SIZE):
+        batch = prebuilt[batch_start:batch_start + SEND_BATCH_SIZE]
         
-        # Subscribe to reply channel
-        pubsub.subscribe(reply_channel)
+        # Publish the batch in one pipelined round trip
+        msg_start = time.perf_counter_ns()
+        stamp = envelope_timestamp_suffix()
+        pipe = r.pipeline(transaction=False)
+        for _, channel_name, body in batch:
+            pipe.publish(channel_name, body + stamp)
+        receivers = pipe.execute()
         
-        # Create and send protobuf message
-        envelope = create_data_envelope(item)
-        envelope.metadata['reply_to'] = reply_channel
-        body = serialize_envelope(envelope)
+        reached = 0
+        for (message_id, _, _), count in zip(batch, receivers):
+            if count:
+                pending[message_id] = msg_start
+                reached += 1
+            else:
+                # Nobody got it, so no ACK can come back
+                stats.record_message(False)
+                print(f" [FAILED] Message {message_id}: No receiver")
+        print(f" [x] Sent messages {batch_start + 1}-{batch_start + len(batch)} "
+              f"({reached} reached a receiver)")
         
-        # Publish with retry (handle potential race condition)
-        receivers = 0
-        for _ in range(3):
-            receivers = r.publish(channel_name, body)
-            if receivers > 0:
+        # Collect ACKs in whatever order they arrive; give up once none has
+        # arrived for REPLY_TIMEOUT_S
+        deadline = time.monotonic() + REPLY_TIMEOUT_S
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
                 break
-            time.sleep(0.01)
-        
-        print(f" (reached {receivers} receivers)...", end='', flush=True)
-            
-        # Wait for reply
-        response_received = False
-        start_wait = time.time()
-        while (time.time() - start_wait) < 0.08:  # 80ms timeout
-            message = pubsub.get_message(timeout=0.01)
-            if message and message['type'] == 'message':
-                try:
-                    resp_envelope = parse_envelope(message['data'])
-                    if is_valid_ack(resp_envelope, message_id):
-                        msg_duration = get_current_time_ms() - msg_start
-                        stats.record_message(True, msg_duration)
-                        print(" [OK]")
-                        response_received = True
-                        break
-                    else:
-                        # Ignore mismatched ACKs (usually late ACKs from previous messages)
-                        continue
-                except Exception:
-                    continue
+            message = pubsub.get_message(timeout=remaining)
+            if not message or message['type'] != 'message':
+                continue
+            data = message['data']
+            # ACK ids are "ack_<original id>"; late ACKs find nothing pending
+            # and are skipped without a full parse when the id can be peeked
+            message_id = peek_message_id(data)
+            if message_id is not None and message_id.removeprefix('ack_') not in pending:
+                continue
+            try:
+                resp_envelope = parse_envelope(data)
+            except Exception:
+                continue
+            message_id = resp_envelope.message_id.removeprefix('ack_')
+            sent_at = pending.pop(message_id, None)
+            if sent_at is None:
+                continue
+            if is_valid_ack(resp_envelope, message_id):
+                stats.record_message_ns(True, time.perf_counter_ns() - sent_at)
+                print(f" [OK] Message {message_id} acknowledged")
+            else:
+                stats.record_message(False)
+                print(f" [FAILED] Message {message_id}: Invalid ACK")
+            deadline = time.monotonic() + REPLY_TIMEOUT_S
         
-        if not response_received:
+        for message_id in pending:
             stats.record_message(False)
-            print(" [FAILED] Timeout")
-            
-        pubsub.unsubscribe(reply_channel)
-        
+            print(f" [FAILED] Message {message_id}: Timeout")
+        pending.clear()
+    
+    pubsub.unsubscribe(reply_channel)
     pubsub.close()
     r.close()
     
@@ -100,8 +145,7 @@ def main():
     print(f"total_received: {stats.received_count}")
     print(f"duration_ms: {stats.get_duration_ms()}")
     
-    with open('logs/report.txt', 'a') as f:
-        f.write(json.dumps(report) + '\n')
+    write_report(report)
 
 
 if __name__ == "__main__":
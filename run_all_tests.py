@@ -1,28 +1,70 @@
 #!/usr/bin/env python3
+import os
+import selectors
 import subprocess
 import time
 import sys
 import argparse
+import atexit
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# Log file writes are buffered and reach the disk in chunks of this size
+LOG_BUFFER_SIZE = 64 * 1024
+
+# Bytes requested per os.read() on a harness's output pipe
+READ_CHUNK_SIZE = 64 * 1024
 
 class Logger:
-    def __init__(self, filename):
-        self.terminal = sys.stdout
-        self.log = open(filename, "w")
+    def __init__(self, filename, echo=True):
+        self.terminal = sys.stdout if echo else None
+        self.log = open(filename, "w", buffering=LOG_BUFFER_SIZE)
 
     def write(self, message):
-        self.terminal.write(message)
+        if self.terminal:
+            self.terminal.write(message)
         self.log.write(message)
-        self.log.flush()
 
     def flush(self):
-        self.terminal.flush()
+        if self.terminal:
+            self.terminal.flush()
         self.log.flush()
 
-def run_test(service, sender, py_receivers, cpp_receivers, report_file, logger, async_sender=False, async_receiver=False, num_messages=1000):
+def tee_output(cmd, cwd=None):
+    """Run cmd, copying its output to sys.stdout (our Logger); returns the exit code."""
+    # Drain the harness output in bulk: each os.read() on the nonblocking
+    # pipe takes whatever is buffered (up to 64 KiB), and the complete
+    # lines go to sys.stdout in one write
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=cwd)
+    fd = process.stdout.fileno()
+    os.set_blocking(fd, False)
+    
+    partial = b""
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while True:
+            selector.select()
+            try:
+                chunk = os.read(fd, READ_CHUNK_SIZE)
+            except BlockingIOError:
+                continue
+            if not chunk:
+                break
+            lines, sep, partial = (partial + chunk).rpartition(b"\n")
+            if sep:
+                sys.stdout.write((lines + sep).decode(errors="replace"))
+    if partial:
+        sys.stdout.write(partial.decode(errors="replace") + "\n")
+    process.stdout.close()
+    return process.wait()
+
+def run_test(service, sender, py_receivers, cpp_receivers, report_file, logger, async_sender=False, async_receiver=False, num_messages=1000, cwd=None, verbose=False):
     mode_str = f"S:{'A' if async_sender else 'N'}/R:{'A' if async_receiver else 'N'}"
     print(f"[-] Running {service} {sender} ({mode_str}) -> {py_receivers} Py / {cpp_receivers} C++...")
     cmd = [
-        "python3", "-u", "test_harness.py",
+        "python3", "-u", str(ROOT / "test_harness.py"),
         "--service", service,
         "--sender", sender,
         "--py-receivers", str(py_receivers),
@@ -36,26 +78,52 @@ def run_test(service, sender, py_receivers, cpp_receivers, report_file, logger,
         cmd.append("--async-receiver")
     
     try:
-        # Capture stdout/stderr and print/log in real-time if possible, 
-        # or just let it write to sys.stdout which is now our Logger
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-        
-        while True:
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
-                break
-            if output:
-                print(output, end='') # This goes to Logger.write
+        log = getattr(logger, "log", None)
+        if verbose or log is None:
+            rc = tee_output(cmd, cwd)
+        else:
+            # The harness writes straight into the log file through an
+            # inherited fd, so its output never passes through this process;
+            # flushing first keeps the scenario header ahead of it
+            logger.flush()
+            rc = subprocess.run(cmd, stdout=log.fileno(), stderr=subprocess.STDOUT, cwd=cwd).returncode
                 
-        rc = process.poll()
         if rc == 0:
             print("[+] Test Completed\n")
+            return True
         else:
             print(f"[!] Test failed with exit code {rc}\n")
             
     except Exception as e:
         print(f" [!] Error running test: {e}")
         print(f"[!] Test failed with exception: {e}\n")
+    return False
+
+def run_service_scenarios(service, scenarios, report_file, num_messages, log_file, workdir, verbose=False):
+    """Run one service's scenarios serially in a worker process.
+    
+    The worker runs the harness from its own working directory so its
+    test_data.json, logs/report.txt and receiver logs never collide with
+    another service's. Returns (passed, failed).
+    """
+    os.makedirs(os.path.join(workdir, "logs", "receiver"), exist_ok=True)
+    stdout = sys.stdout
+    sys.stdout = Logger(log_file, echo=False)
+    
+    passed = failed = 0
+    try:
+        for i, (_, sender, py, cpp, async_s, async_r) in enumerate(scenarios):
+            print(f"Scenario {i+1}/{len(scenarios)} ({service})")
+            if run_test(service, sender, py, cpp, report_file, sys.stdout, async_s, async_r, num_messages, cwd=workdir, verbose=verbose):
+                passed += 1
+            else:
+                failed += 1
+            # Small cooldown to ensure ports allow release if needed
+            time.sleep(1)
+    finally:
+        sys.stdout.log.close()
+        sys.stdout = stdout
+    return passed, failed
 
 def main():
     parser = argparse.ArgumentParser(description="Run messaging service tests")
@@ -63,6 +131,10 @@ def main():
     parser.add_argument("--all", action="store_true", help="Run all services (default behavior)")
     parser.add_argument("--messages", type=int, default=35, help="Number of messages to generate")
     parser.add_argument("--receivers", type=int, default=32, help="Number of receivers to generate data for")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="Services to test in parallel (default: 1, serial; results under parallel load aren't comparable with serial runs)")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                        help="Relay harness output through this process (echoed to the terminal) instead of writing it straight to the log")
     args = parser.parse_args()
     
     all_services = ['grpc', 'zeromq', 'redis', 'rabbitmq', 'nats', 'activemq']
@@ -79,11 +151,14 @@ def main():
         services = default_services
     
     timestamp = time.strftime("%Y%m%d-%H%M%S")
-    report_file = f"logs/report{timestamp}_m{args.messages}.json"
+    report_file = os.path.abspath(f"logs/report{timestamp}_m{args.messages}.json")
     log_file = f"logs/run_log_{timestamp}_m{args.messages}.txt"
     
     # Redirect stdout to Logger
     sys.stdout = Logger(log_file)
+    # The log is flushed in 64 KiB chunks; make sure the tail reaches disk
+    # even if the run dies with an exception
+    atexit.register(sys.stdout.flush)
     
     print(f"Results will be written to {report_file}")
     print(f"Log will be written to {log_file}")
@@ -111,11 +186,43 @@ def main():
     print(f"Starting execution of {count} test scenarios...")
     start_time = time.time()
 
-    for i, (service, sender, py, cpp, async_s, async_r) in enumerate(scenarios):
-        print(f"Scenario {i+1}/{count}")
-        run_test(service, sender, py, cpp, report_file, sys.stdout, async_s, async_r, args.messages)
-        # Small cooldown to ensure ports allow release if needed
-        time.sleep(1) 
+    # Serial by default: services share localhost brokers and CPUs, so
+    # parallel runs are opt-in
+    jobs = min(args.jobs or 1, len(services))
+    if jobs <= 1:
+        for i, (service, sender, py, cpp, async_s, async_r) in enumerate(scenarios):
+            print(f"Scenario {i+1}/{count}")
+            run_test(service, sender, py, cpp, report_file, sys.stdout, async_s, async_r, args.messages, verbose=args.verbose)
+            # Small cooldown to ensure ports allow release if needed
+            time.sleep(1) 
+    else:
+        # Services use disjoint brokers/ports, so each one runs its own
+        # scenarios serially in a separate worker process and working dir
+        print(f"Running {len(services)} services in parallel ({jobs} workers)")
+        service_logs = {}
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {}
+            for service in services:
+                service_logs[service] = os.path.abspath(f"logs/run_log_{service}_{timestamp}_m{args.messages}.txt")
+                futures[executor.submit(
+                    run_service_scenarios,
+                    service,
+                    [s for s in scenarios if s[0] == service],
+                    report_file,
+                    args.messages,
+                    service_logs[service],
+                    os.path.abspath(f"logs/workers/{service}"),
+                    args.verbose
+                )] = service
+            for future in as_completed(futures):
+                passed, failed = future.result()
+                print(f"[+] {futures[future]}: {passed} passed, {failed} failed (log: {service_logs[futures[future]]})")
+        
+        # Append the per-service logs to the main log in service order
+        for service in services:
+            with open(service_logs[service]) as f:
+                sys.stdout.log.write(f"\n===== {service} =====\n" + f.read())
+        sys.stdout.flush()
 
     duration = time.time() - start_time
     print(f"All tests completed in {duration:.2f} seconds.")
@@ -5,6 +5,8 @@ per-repo delete_prep.txt files listing paths to remove.
 Usage: python scripts/generate_delete_prep.py
 """
 import os
+import re
+from fnmatch import translate
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -20,25 +22,54 @@ FILE_GLOBS = [
     '*.log', '*.tmp', '*.pid', '*.pyc', '*_pb.h', '*_pb.cc', '*_grpc.pb.h', '*_grpc.pb.cc'
 ]
 
+# Split the patterns once so each directory entry is matched with a set
+# lookup, a single endswith() and one regex for the remaining globs
+EXACT_NAMES = {name for name in DIR_NAMES + FILE_GLOBS if not any(c in name for c in '*?[')}
+SUFFIXES = tuple(g[1:] for g in DIR_NAMES + FILE_GLOBS
+                 if g.startswith('*') and not any(c in g[1:] for c in '*?['))
+WILDCARDS = [g for g in DIR_NAMES + FILE_GLOBS
+             if g not in EXACT_NAMES and not (g.startswith('*') and g[1:] in SUFFIXES)]
+WILDCARD_RE = re.compile('|'.join(translate(g) for g in WILDCARDS)) if WILDCARDS else None
+
+
+def matches(name: str) -> bool:
+    return (name in EXACT_NAMES or name.endswith(SUFFIXES)
+            or (WILDCARD_RE is not None and WILDCARD_RE.match(name) is not None))
+
+
 def scan_repo(repo_path: Path):
-    found = []
-    # Check directories by name
-    for name in DIR_NAMES:
-        # support simple glob like build-*
-        for p in repo_path.glob(name):
-            found.append(p)
-        # also search recursively for matching dir name
-        for p in repo_path.rglob(name):
-            found.append(p)
+    """Collect matching paths with one os.scandir walk of the repo.
+    
+    A matching directory is listed once and not descended into, since
+    removing it removes everything below it.
+    """
+    found = set()
+    stack = [str(repo_path)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if matches(entry.name):
+                    found.add(Path(entry.path).resolve())
+                elif entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
 
-    # Check file globs recursively
-    for pattern in FILE_GLOBS:
-        for p in repo_path.rglob(pattern):
-            found.append(p)
+    return sorted(found)
 
-    # dedupe and sort
-    found = sorted({p.resolve() for p in found})
-    return found
+def write_delete_prep(out_file: Path, found, base: Path):
+    """Write found paths to out_file, one per line, in a single write."""
+    lines = []
+    for p in found:
+        # write paths relative to the base when possible
+        try:
+            lines.append(str(p.relative_to(base)))
+        except ValueError:
+            lines.append(str(p))
+    with open(out_file, 'wb') as f:
+        f.write(('\n'.join(lines) + '\n').encode())
 
 def main():
     print(f"Scanning repos under {ROOT}")
@@ -52,14 +83,7 @@ def main():
         if not found:
             continue
         out_file = repo / 'delete_prep.txt'
-        with out_file.open('w') as f:
-            for p in found:
-                # write paths relative to repo root when possible
-                try:
-                    rel = p.relative_to(repo)
-                except Exception:
-                    rel = p
-                f.write(str(rel) + '\n')
+        write_delete_prep(out_file, found, repo)
         print(f"Wrote {len(found)} entries to {out_file}")
         total += len(found)
 
@@ -67,13 +91,7 @@ def main():
     found_root = scan_repo(ROOT)
     if found_root:
         out_file = ROOT / 'delete_prep.txt'
-        with out_file.open('w') as f:
-            for p in found_root:
-                try:
-                    rel = p.relative_to(ROOT)
-                except Exception:
-                    rel = p
-                f.write(str(rel) + '\n')
+        write_delete_prep(out_file, found_root, ROOT)
         print(f"Wrote {len(found_root)} entries to {out_file}")
         total += len(found_root)
 
@@ -6,20 +6,29 @@ easily recovered if needed before permanent deletion.
 
 Usage: python scripts/move_to_staging.py
 """
+import errno
+import os
 import shutil
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 STAGING = ROOT / 'DELETE_STAGING'
 
+# os.replace errors that shutil.move (the original behaviour) can still handle
+_MOVE_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOTEMPTY, errno.EEXIST, errno.EISDIR, errno.ENOTDIR}
+
 def move_paths_from_file(delete_file: Path, base_repo: Path):
     """Move all paths in delete_file to staging, relative to base_repo."""
     moved = 0
     failed = 0
+    # Staging parents already created for this file
+    made_dirs = set()
     
     if not delete_file.exists():
         return moved, failed
     
+    rel_to_root = base_repo.relative_to(ROOT)
+    
     with delete_file.open('r') as f:
         for line in f:
             line = line.strip()
@@ -33,14 +42,21 @@ def move_paths_from_file(delete_file: Path, base_repo: Path):
                 continue
             
             # Preserve repo structure in staging
-            rel_to_root = base_repo.relative_to(ROOT)
             dest = STAGING / rel_to_root / line
-            dest.parent.mkdir(parents=True, exist_ok=True)
+            if dest.parent not in made_dirs:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                made_dirs.add(dest.parent)
             
             try:
-                if src.is_dir():
-                    shutil.move(str(src), str(dest))
-                else:
+                # Staging normally shares the repo's filesystem, where a rename
+                # moves a whole file or directory tree in one metadata update.
+                # A cross-device move, or a dest left over from an earlier run
+                # that a rename cannot replace, falls back to shutil.move
+                try:
+                    os.replace(src, dest)
+                except OSError as e:
+                    if e.errno not in _MOVE_FALLBACK_ERRNOS:
+                        raise
                     shutil.move(str(src), str(dest))
                 print(f"  MOVED: {line}")
                 moved += 1
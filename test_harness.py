@@ -13,6 +13,9 @@ import argparse
 import signal
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'utils' / 'python'))
+from stats_collector import write_report
+
 class TestHarness:
     def __init__(self, service: str, sender_lang: str, py_receivers: int, cpp_receivers: int, async_sender: bool = False, async_receiver: bool = False, base_port: int = 50051):
         self.service = service
@@ -357,7 +360,10 @@ def main():
     # Generate data if messages specified
     if args.messages:
         print(f"[Harness] Generating data for {args.messages} messages and {args.py_receivers + args.cpp_receivers} receivers...")
-        subprocess.run(["python3", "generate_data.py", "--messages", str(args.messages), "--receivers", str(args.py_receivers + args.cpp_receivers)], check=True)
+        # generate_data.py writes test_data.json into the current directory,
+        # which is where the senders look for it first
+        generate_script = str(Path(__file__).resolve().parent / "generate_data.py")
+        subprocess.run(["python3", generate_script, "--messages", str(args.messages), "--receivers", str(args.py_receivers + args.cpp_receivers)], check=True)
 
     harness = TestHarness(
         service=args.service,
@@ -392,8 +398,8 @@ def main():
     }
 
     if args.report:
-        with open(args.report, 'a') as f:
-            f.write(json.dumps(final_results) + '\n')
+        # One O_APPEND write per line, so parallel harnesses never interleave
+        write_report(final_results, args.report)
         print(f"[Harness] Results appended to {args.report}")
 
 
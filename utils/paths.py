@@ -4,6 +4,7 @@ Centralized path constants for the project.
 Uses repo_root.py to get the repository root and defines standard paths.
 """
 from pathlib import Path
+from types import MappingProxyType
 from repo_root import get_repo_root_cached
 
 
@@ -38,6 +39,16 @@ GRPC_CPP_PATH = GRPC_PATH / 'cpp'
 ACTIVEMQ_PATH = REPO_ROOT / 'activeMQ'
 ACTIVEMQ_PYTHON_PATH = ACTIVEMQ_PATH / 'python-client'
 
+# Service name (lower-case) -> Python directory; read-only, built once
+SERVICE_PYTHON_PATHS = MappingProxyType({
+    'redis': REDIS_PYTHON_PATH,
+    'rabbitmq': RABBITMQ_PYTHON_PATH,
+    'zeromq': ZEROMQ_PYTHON_PATH,
+    'nats': NATS_PYTHON_PATH,
+    'grpc': GRPC_PYTHON_PATH,
+    'activemq': ACTIVEMQ_PYTHON_PATH,
+})
+
 # Build paths
 GRPC_CPP_BUILD_PATH = GRPC_CPP_PATH / 'build'
 GRPC_CPP_DEPS_PATH = GRPC_CPP_BUILD_PATH / 'deps'
@@ -45,8 +56,18 @@ GRPC_CPP_DEPS_PATH = GRPC_CPP_BUILD_PATH / 'deps'
 # Test data path
 TEST_DATA_PATH = REPO_ROOT / 'test_data.json'
 
-# Report path (in current working directory)
-REPORT_PATH = Path.cwd() / 'logs/report.txt'
+
+def get_report_path() -> Path:
+    """Get the report path in the current working directory, resolved at call time."""
+    return Path.cwd() / 'logs/report.txt'
+
+
+def __getattr__(name: str):
+    # REPORT_PATH used to be a constant frozen at import; keep it working,
+    # but resolve it against the working directory at the time of access
+    if name == 'REPORT_PATH':
+        return get_report_path()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_grpc_python_path() -> Path:
@@ -69,15 +90,7 @@ def get_service_python_path(service: str) -> Path:
     Returns:
         Path: The service's Python directory.
     """
-    service_paths = {
-        'redis': REDIS_PYTHON_PATH,
-        'rabbitmq': RABBITMQ_PYTHON_PATH,
-        'zeromq': ZEROMQ_PYTHON_PATH,
-        'nats': NATS_PYTHON_PATH,
-        'grpc': GRPC_PYTHON_PATH,
-        'activemq': ACTIVEMQ_PYTHON_PATH,
-    }
-    return service_paths.get(service.lower())
+    return SERVICE_PYTHON_PATHS.get(service.lower())
 
 
 if __name__ == '__main__':
@@ -4,19 +4,80 @@ Provides clean helper functions for protobuf MessageEnvelope operations.
 Mirrors the C++ message_helpers.hpp functionality.
 """
 import time
+import struct
 import sys
+import threading
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Optional
 
 # Add utils/python to path if not already there
 repo_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(repo_root / 'utils' / 'python'))
 
 from messaging_pb2 import MessageEnvelope, DataMessage, Acknowledgment, MessageType, RoutingMode
+from google.protobuf.internal import api_implementation
+
+# The protobuf wheels serialize/parse in compiled code (upb); the pure-Python
+# backend, picked when no binary wheel fits the platform or when
+# PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION=python, is many times slower and
+# would skew every Python latency measurement
+PROTOBUF_BACKEND = api_implementation.Type()
+if PROTOBUF_BACKEND == 'python':
+    print(" [!] protobuf is using its pure-Python backend; install a binary protobuf wheel "
+          "for representative Python results", file=sys.stderr)
+
+
+# Hot-path names bound once at module level instead of looked up per envelope
+_DATA_MESSAGE = MessageType.DATA_MESSAGE
+_POINT_TO_POINT = RoutingMode.POINT_TO_POINT
+_ACK = MessageType.ACK
+_REQUEST_REPLY = RoutingMode.REQUEST_REPLY
+_ACK_PREFIX = "ack_"
+_time_ns = time.time_ns
+
+# Per-thread scratch DataMessage: create_data_envelope only needs it long
+# enough to serialize into the envelope's payload, so it is cleared and reused
+_scratch = threading.local()
+
+# Free-list of cleared MessageEnvelopes for borrow_envelope(); deque append
+# and pop are atomic, so threads can share it
+ENVELOPE_POOL_SIZE = 256
+_envelope_pool = deque(maxlen=ENVELOPE_POOL_SIZE)
 
 
 def get_current_time_ms() -> int:
     """Get current time in milliseconds."""
-    return int(time.time() * 1000)
+    return _time_ns() // 1_000_000
+
+
+def _scratch_data_message() -> DataMessage:
+    data_msg = getattr(_scratch, 'data_msg', None)
+    if data_msg is None:
+        data_msg = _scratch.data_msg = DataMessage()
+    else:
+        data_msg.Clear()
+    return data_msg
+
+
+@contextmanager
+def borrow_envelope():
+    """Lend a cleared MessageEnvelope from the free-list for the with block.
+    
+    For envelopes that are built or parsed, serialized/read and dropped
+    within one step (e.g. a receiver's request and ACK); the envelope must
+    not be used after the block, as it is cleared and handed out again.
+    """
+    try:
+        envelope = _envelope_pool.pop()
+    except IndexError:
+        envelope = MessageEnvelope()
+    try:
+        yield envelope
+    finally:
+        envelope.Clear()
+        _envelope_pool.append(envelope)
 
 
 def extract_message_id(item: dict) -> str:
@@ -29,30 +90,47 @@ def extract_message_id(item: dict) -> str:
 
 def create_data_envelope(
     item: dict, 
-    routing: RoutingMode = RoutingMode.POINT_TO_POINT,
+    routing: RoutingMode = _POINT_TO_POINT,
     metadata: dict = None
 ) -> MessageEnvelope:
     """Create a MessageEnvelope from test data JSON with DataMessage payload."""
-    envelope = MessageEnvelope()
+    return fill_data_envelope(MessageEnvelope(), item, routing, metadata)
+
+
+def fill_data_envelope(
+    envelope: MessageEnvelope,
+    item: dict,
+    routing: RoutingMode = _POINT_TO_POINT,
+    metadata: dict = None,
+    _now=get_current_time_ms,
+    _data_type=_DATA_MESSAGE
+) -> MessageEnvelope:
+    """Clear and refill an existing MessageEnvelope from test data JSON.
+    
+    Lets hot send loops reuse one envelope instead of allocating per message.
+    """
+    envelope.Clear()
     envelope.message_id = extract_message_id(item)
     envelope.target = item.get('target', 0)
-    envelope.type = MessageType.DATA_MESSAGE
-    envelope.timestamp = get_current_time_ms()
+    envelope.type = _data_type
+    envelope.timestamp = _now()
     envelope.routing = routing
     envelope.qos = 1
     setattr(envelope, 'async', False)
     
-    # Set metadata
-    if metadata:
-        for k, v in metadata.items():
-            envelope.metadata[k] = str(v)
-    
-    if 'metadata' in item and isinstance(item['metadata'], dict):
-        for k, v in item['metadata'].items():
-            envelope.metadata[k] = str(v)
+    # Set metadata: both sources merged into one dict (item's metadata wins),
+    # then copied into the protobuf map in a single update
+    item_metadata = item.get('metadata')
+    if metadata or item_metadata:
+        meta = {}
+        if metadata:
+            meta.update((k, v if type(v) is str else str(v)) for k, v in metadata.items())
+        if isinstance(item_metadata, dict):
+            meta.update((k, v if type(v) is str else str(v)) for k, v in item_metadata.items())
+        envelope.metadata.update(meta)
     
     # Create DataMessage payload
-    data_msg = DataMessage()
+    data_msg = _scratch_data_message()
     data_msg.message_name = item.get('message_name', item.get('topic', ''))
     
     # Handle message_value array
@@ -70,20 +148,62 @@ def create_data_envelope(
     return envelope
 
 
+def _append_varint(out: bytearray, value: int) -> None:
+    """Append value to out as a protobuf base-128 varint."""
+    value &= 0xFFFFFFFFFFFFFFFF
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int):
+    """Decode the varint at data[pos]; returns (value, next_pos), or (None, pos) if truncated."""
+    value = 0
+    shift = 0
+    end = len(data)
+    while pos < end:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+    return None, pos
+
+
+def envelope_timestamp_suffix(timestamp_ms: int = None) -> bytes:
+    """Encode a MessageEnvelope ``timestamp`` field (defaults to now).
+    
+    Protobuf keeps the last value seen for a scalar field, so appending this
+    to a pre-serialized envelope restamps it without re-serializing.
+    """
+    if timestamp_ms is None:
+        timestamp_ms = get_current_time_ms()
+    # Field 7 (timestamp), wire type 0 (varint)
+    out = bytearray(b'\x38')
+    _append_varint(out, timestamp_ms)
+    return bytes(out)
+
+
 def create_ack_envelope(
     original_message_id: str,
     target: int,
     receiver_id: str,
     status: str = "OK",
-    latency_ms: float = 0.5
+    latency_ms: float = 0.5,
+    envelope: MessageEnvelope = None
 ) -> MessageEnvelope:
-    """Create an ACK MessageEnvelope."""
-    envelope = MessageEnvelope()
-    envelope.message_id = f"ack_{original_message_id}"
+    """Create an ACK MessageEnvelope, or clear and refill the given one."""
+    if envelope is None:
+        envelope = MessageEnvelope()
+    else:
+        envelope.Clear()
+    envelope.message_id = _ACK_PREFIX + original_message_id
     envelope.target = target
-    envelope.type = MessageType.ACK
+    envelope.type = _ACK
     envelope.timestamp = get_current_time_ms()
-    envelope.routing = RoutingMode.REQUEST_REPLY
+    envelope.routing = _REQUEST_REPLY
     envelope.qos = 1
     
     # Populate direct Acknowledgment field
@@ -97,38 +217,246 @@ def create_ack_envelope(
     return envelope
 
 
-def create_ack_from_envelope(msg_envelope: MessageEnvelope, receiver_id: str) -> MessageEnvelope:
+def create_ack_from_envelope(
+    msg_envelope: MessageEnvelope,
+    receiver_id: str,
+    envelope: MessageEnvelope = None
+) -> MessageEnvelope:
     """Create an ACK MessageEnvelope from a received message envelope."""
-    return create_ack_envelope(
-        original_message_id=msg_envelope.message_id,
-        target=msg_envelope.target,
-        receiver_id=receiver_id,
-        status="OK",
-        latency_ms=0.5
-    )
-
-
-def parse_envelope(data: bytes) -> MessageEnvelope:
-    """Parse a MessageEnvelope from binary data."""
-    envelope = MessageEnvelope()
+    # Positional arguments: this runs once per received message
+    return create_ack_envelope(msg_envelope.message_id, msg_envelope.target, receiver_id, "OK", 0.5, envelope)
+
+
+def parse_envelope(data: bytes, envelope: MessageEnvelope = None) -> MessageEnvelope:
+    """Parse a MessageEnvelope from binary data, into the given envelope if any."""
+    if envelope is None:
+        envelope = MessageEnvelope()
     envelope.ParseFromString(data)
     return envelope
 
 
+def peek_message_id(data: bytes) -> Optional[str]:
+    """Read a serialized MessageEnvelope's ``message_id`` without parsing it.
+    
+    Protobuf serializers write fields in field-number order, so a non-empty
+    message_id (field 1) leads the buffer. Returns None when it does not,
+    and the caller should fall back to parse_envelope().
+    """
+    # Field 1 (message_id), wire type 2 (length-delimited)
+    if not data or data[0] != 0x0A:
+        return None
+    length, pos = _read_varint(data, 1)
+    if length is None or pos + length > len(data):
+        return None
+    try:
+        return data[pos:pos + length].decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
+
 def serialize_envelope(envelope: MessageEnvelope) -> bytes:
     """Serialize a MessageEnvelope to binary data."""
     return envelope.SerializeToString()
 
 
+def serialize_envelopes(envelopes, out: bytearray = None) -> bytearray:
+    """Serialize envelopes as one length-delimited stream (varint size, then message).
+    
+    Everything goes into a single buffer, appended to out when given, so a
+    batch is framed and sent as one blob instead of one bytes object each.
+    """
+    if out is None:
+        out = bytearray()
+    for envelope in envelopes:
+        data = envelope.SerializeToString()
+        _append_varint(out, len(data))
+        out += data
+    return out
+
+
+def parse_envelopes(data: bytes) -> list:
+    """Parse a stream written by serialize_envelopes back into MessageEnvelopes."""
+    envelopes = []
+    pos = 0
+    end = len(data)
+    while pos < end:
+        length, pos = _read_varint(data, pos)
+        if length is None or pos + length > end:
+            raise ValueError("Truncated length-delimited MessageEnvelope stream")
+        envelope = MessageEnvelope()
+        envelope.ParseFromString(data[pos:pos + length])
+        envelopes.append(envelope)
+        pos += length
+    return envelopes
+
+
 def is_valid_ack(envelope: MessageEnvelope, expected_message_id: str) -> bool:
     """Check if an envelope is a valid ACK for the given message_id."""
     if not envelope.HasField('ack'):
-        # Fallback for old style where it might be in payload
+        # Fallback for old style where it might be in payload. Serializers
+        # write original_message_id (field 1) first, so a payload that doesn't
+        # start with its tag can't be an ACK for a non-empty id: such payloads
+        # (e.g. data echoed back) are rejected without a parse and exception
+        payload = envelope.payload
+        if not payload or (expected_message_id and payload[0] != _ACK_ORIGINAL_ID_TAG):
+            return False
         try:
             ack = Acknowledgment()
-            ack.ParseFromString(envelope.payload)
+            ack.ParseFromString(payload)
             return ack.original_message_id == expected_message_id and ack.received
         except Exception:
             return False
             
     return envelope.ack.original_message_id == expected_message_id and envelope.ack.received
+
+
+# Wire tags ((field_number << 3) | wire_type) read by is_valid_ack_bytes
+_ENVELOPE_PAYLOAD_TAG = 0x2A  # MessageEnvelope.payload = 5, length-delimited
+_ENVELOPE_ACK_TAG = 0x5A      # MessageEnvelope.ack = 11, length-delimited
+_ACK_ORIGINAL_ID_TAG = 0x0A   # Acknowledgment.original_message_id = 1, length-delimited
+_ACK_RECEIVED_TAG = 0x10      # Acknowledgment.received = 2, varint
+
+
+def _iter_fields(data: bytes, pos: int, end: int):
+    """Yield (tag, value) for the fields in data[pos:end] without building messages.
+    
+    value is the int for varints and the (start, stop) span for
+    length-delimited fields, None for fixed-width ones. Raises ValueError
+    on malformed input.
+    """
+    while pos < end:
+        tag, pos = _read_varint(data, pos)
+        if tag is None:
+            raise ValueError("Truncated tag")
+        wire_type = tag & 0x7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+            if value is None:
+                raise ValueError("Truncated varint")
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            if length is None or pos + length > end:
+                raise ValueError("Truncated length-delimited field")
+            value = (pos, pos + length)
+            pos += length
+        elif wire_type == 1:
+            value = None
+            pos += 8
+        elif wire_type == 5:
+            value = None
+            pos += 4
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type}")
+        if pos > end:
+            raise ValueError("Truncated fixed-width field")
+        yield tag, value
+
+
+def _scan_ack(data: bytes, spans, expected_id: bytes) -> bool:
+    # Repeated occurrences of a submessage merge, and the last scalar wins
+    original_id = b""
+    received = False
+    for start, stop in spans:
+        for tag, value in _iter_fields(data, start, stop):
+            if tag == _ACK_ORIGINAL_ID_TAG:
+                original_id = data[value[0]:value[1]]
+            elif tag == _ACK_RECEIVED_TAG:
+                received = bool(value)
+    return received and original_id == expected_id
+
+
+def is_valid_ack_bytes(data: bytes, expected_message_id: str) -> bool:
+    """is_valid_ack on a serialized envelope, reading only the fields it needs.
+    
+    Walks the wire format for the ``ack`` submessage (or, without one, the
+    payload holding an old-style Acknowledgment) instead of parsing a whole
+    MessageEnvelope. Malformed data is not a valid ACK.
+    """
+    expected_id = expected_message_id.encode('utf-8')
+    try:
+        ack_spans = []
+        payload_span = None
+        for tag, value in _iter_fields(data, 0, len(data)):
+            if tag == _ENVELOPE_ACK_TAG:
+                ack_spans.append(value)
+            elif tag == _ENVELOPE_PAYLOAD_TAG:
+                payload_span = value
+        if ack_spans:
+            return _scan_ack(data, ack_spans, expected_id)
+        if payload_span is None:
+            return False
+        # Fallback for old style where it might be in payload
+        return _scan_ack(data, [payload_span], expected_id)
+    except ValueError:
+        return False
+
+
+# Wire encodings of the fixed ACK envelope fields
+_ACK_TYPE_FIELD = bytes([0x20, _ACK])                       # type = 4
+_ASYNC_TRUE_FIELD = b'\x30\x01'                             # async = 6
+_ACK_ROUTING_QOS_FIELDS = bytes([0x40, _REQUEST_REPLY, 0x48, 1])  # routing = 8, qos = 9
+_ACK_RECEIVED_FIELD = b'\x10\x01'                           # Acknowledgment.received = 2
+_ENVELOPE_MESSAGE_ID_TAG = 0x0A  # MessageEnvelope.message_id = 1, length-delimited
+_ENVELOPE_TARGET_TAG = 0x10      # MessageEnvelope.target = 2, varint
+_ENVELOPE_TIMESTAMP_TAG = 0x38   # MessageEnvelope.timestamp = 7, varint
+_ACK_LATENCY_TAG = 0x19          # Acknowledgment.latency_ms = 3, fixed64
+_ACK_RECEIVER_ID_TAG = 0x22      # Acknowledgment.receiver_id = 4, length-delimited
+_ACK_STATUS_TAG = 0x2A           # Acknowledgment.status = 5, length-delimited
+
+
+def _append_bytes_field(out: bytearray, tag: int, value: bytes) -> None:
+    # proto3 leaves empty strings/bytes off the wire
+    if value:
+        out.append(tag)
+        _append_varint(out, len(value))
+        out += value
+
+
+def serialize_ack_from_raw(
+    data: bytes,
+    receiver_id: str,
+    status: str = "OK",
+    latency_ms: float = 0.5,
+    async_flag: bool = False
+) -> bytes:
+    """Serialize the ACK for a serialized request envelope without parsing it.
+    
+    Parses to the same envelope as create_ack_from_envelope() on the parsed
+    request (with async set as given): only the request's message_id and
+    target are read from the wire, and the ACK fields are encoded directly,
+    so the request's payload and metadata are never decoded. Raises
+    ValueError if data is malformed.
+    """
+    message_id = b""
+    target = 0
+    for tag, value in _iter_fields(data, 0, len(data)):
+        if tag == _ENVELOPE_MESSAGE_ID_TAG:
+            message_id = data[value[0]:value[1]]
+        elif tag == _ENVELOPE_TARGET_TAG:
+            target = value
+    
+    ack = bytearray()
+    _append_bytes_field(ack, _ACK_ORIGINAL_ID_TAG, message_id)
+    if status == "OK":
+        ack += _ACK_RECEIVED_FIELD
+    if latency_ms:
+        ack.append(_ACK_LATENCY_TAG)
+        ack += struct.pack('<d', latency_ms)
+    _append_bytes_field(ack, _ACK_RECEIVER_ID_TAG, receiver_id.encode('utf-8'))
+    _append_bytes_field(ack, _ACK_STATUS_TAG, status.encode('utf-8'))
+    
+    out = bytearray()
+    _append_bytes_field(out, _ENVELOPE_MESSAGE_ID_TAG, _ACK_PREFIX.encode() + message_id)
+    if target:
+        out.append(_ENVELOPE_TARGET_TAG)
+        _append_varint(out, target)
+    out += _ACK_TYPE_FIELD
+    if async_flag:
+        out += _ASYNC_TRUE_FIELD
+    out.append(_ENVELOPE_TIMESTAMP_TAG)
+    _append_varint(out, _time_ns() // 1_000_000)
+    out += _ACK_ROUTING_QOS_FIELDS
+    out.append(_ENVELOPE_ACK_TAG)
+    _append_varint(out, len(ack))
+    out += ack
+    return bytes(out)
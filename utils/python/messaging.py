@@ -3,13 +3,93 @@
 Unified Messaging Core - Protocol-agnostic messaging for all services.
 Uses JSON serialization for compatibility across all languages.
 """
+import os
+import sys
+import array
 import uuid
 import json
 import time
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+import itertools
+from pathlib import Path
+from dataclasses import dataclass, field, fields
+from typing import Dict, Optional, Any
 from enum import IntEnum
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# JSON decoder, bound once; both accept bytes directly
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Encode obj as compact UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # orjson rejects non-str keys (e.g. int metadata keys) unless
+            # asked to stringify them, as json.dumps does; that mode is slower
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":")).encode('utf-8')
+
+
+# messaging_pb2 as cached by _load_proto(): False until the first lookup,
+# None if it could not be imported
+_messaging_pb2 = False
+
+
+def _load_proto():
+    """Import messaging_pb2 once, with grpc/python on sys.path; None if unavailable.
+    
+    The path setup and import used to run on every protobuf conversion; the
+    result (module or None) is cached after the first call.
+    """
+    global _messaging_pb2
+    if _messaging_pb2 is False:
+        try:
+            from repo_root import get_repo_root_cached
+            repo_root = get_repo_root_cached()
+        except ImportError:
+            # repo_root lives in utils/, which may not be on sys.path
+            repo_root = Path(__file__).resolve().parents[2]
+        grpc_python_path = str(repo_root / 'grpc' / 'python')
+        if grpc_python_path not in sys.path:
+            sys.path.insert(0, grpc_python_path)
+        try:
+            import messaging_pb2
+        except ImportError:
+            # Fallback if generated file not found (e.g. in tests without build)
+            messaging_pb2 = None
+        _messaging_pb2 = messaging_pb2
+    return _messaging_pb2
+
+
+# Generated message ids only need to be unique per process, so a counter with
+# a per-process prefix replaces a uuid4() (urandom read + formatting) per message
+_MESSAGE_ID_PREFIX = f"{os.getpid():x}-{uuid.uuid4().hex[:8]}-"
+_message_id_counter = itertools.count(1)
+
+
+# Wall-clock reads in integer ns: ms timestamps come from an integer division
+# instead of a float multiply and int() round trip
+_time_ns = time.time_ns
+
+# ACK message ids are the original id with this prefix
+_ACK_PREFIX = "ack_"
+
+
+def next_message_id() -> str:
+    """Return a process-unique message/correlation id."""
+    return _MESSAGE_ID_PREFIX + format(next(_message_id_counter), 'x')
+
 
 class MessageType(IntEnum):
     MESSAGE_TYPE_UNSPECIFIED = 0
@@ -36,6 +116,54 @@ class QoSLevel(IntEnum):
     EXACTLY_ONCE = 3
 
 
+# Enum members by wire value; a dict lookup is much cheaper than calling the
+# enum class when decoding every envelope
+_MESSAGE_TYPES = {member.value: member for member in MessageType}
+_ROUTING_MODES = {member.value: member for member in RoutingMode}
+_QOS_LEVELS = {member.value: member for member in QoSLevel}
+
+
+def _to_enum(members: Dict[int, IntEnum], enum_cls, value) -> IntEnum:
+    """Map a wire value to its enum member; unknown values raise as enum_cls(value) does."""
+    member = members.get(value)
+    return member if member is not None else enum_cls(value)
+
+
+def _payload_to_json(payload: Any) -> Any:
+    """JSON form of a payload: UTF-8 bytes as a string, other bytes as a list of ints.
+    
+    Payloads are nearly always encoded text, which travels as one JSON string
+    rather than one number per byte; both forms decode back to the same bytes
+    here and in the C++ messaging_utils.
+    """
+    if isinstance(payload, bytes):
+        try:
+            return payload.decode('utf-8')
+        except UnicodeDecodeError:
+            return list(payload)
+    if isinstance(payload, list):
+        return list(payload)
+    return payload
+
+
+def _slotted(cls):
+    """Rebuild a dataclass with __slots__ for its fields, as dataclass(slots=True) does on 3.10+.
+    
+    Instances then have no per-instance __dict__: they are smaller and their
+    attributes are read through slot descriptors.
+    """
+    namespace = dict(cls.__dict__)
+    field_names = tuple(f.name for f in fields(cls))
+    namespace['__slots__'] = field_names
+    # Class-level defaults would clash with the slots; __init__ has them
+    for name in field_names:
+        namespace.pop(name, None)
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_slotted
 @dataclass
 class MessageEnvelope:
     """Unified message envelope for all services."""
@@ -52,18 +180,20 @@ class MessageEnvelope:
     
     def __post_init__(self):
         if not self.message_id:
-            self.message_id = str(uuid.uuid4())
+            self.message_id = next_message_id()
         if not self.timestamp:
-            self.timestamp = int(time.time() * 1000)
+            self.timestamp = _time_ns() // 1_000_000
     
     def serialize(self) -> bytes:
         """Serialize to bytes (JSON format)."""
-        return self.to_json().encode('utf-8')
+        # Straight to bytes, without going through a str
+        return _json_dumps(self.to_dict())
     
     @classmethod
     def deserialize(cls, data: bytes) -> 'MessageEnvelope':
         """Deserialize from bytes."""
-        return cls.from_json(data.decode('utf-8') if isinstance(data, bytes) else data)
+        # The JSON decoder takes the UTF-8 bytes directly, without a decode to str
+        return cls.from_json(data)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -72,7 +202,7 @@ class MessageEnvelope:
             "target": self.target,
             "topic": self.topic,
             "type": int(self.message_type),
-            "payload": list(self.payload) if isinstance(self.payload, (list, bytes)) else self.payload,
+            "payload": _payload_to_json(self.payload),
             "async": self.async_flag,
             "timestamp": self.timestamp,
             "routing": int(self.routing),
@@ -82,7 +212,7 @@ class MessageEnvelope:
     
     def to_json(self) -> str:
         """Convert to JSON string."""
-        return json.dumps(self.to_dict(), separators=(",", ":"))
+        return _json_dumps(self.to_dict()).decode('utf-8')
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'MessageEnvelope':
@@ -97,35 +227,26 @@ class MessageEnvelope:
             message_id=data.get("message_id", ""),
             target=data.get("target", 0),
             topic=data.get("topic", ""),
-            message_type=MessageType(data.get("type", MessageType.DATA_MESSAGE)),
+            message_type=_to_enum(_MESSAGE_TYPES, MessageType, data.get("type", MessageType.DATA_MESSAGE)),
             payload=payload,
             async_flag=data.get("async", False),
             timestamp=data.get("timestamp", 0),
-            routing=RoutingMode(data.get("routing", RoutingMode.POINT_TO_POINT)),
-            qos=QoSLevel(data.get("qos", QoSLevel.AT_MOST_ONCE)),
+            routing=_to_enum(_ROUTING_MODES, RoutingMode, data.get("routing", RoutingMode.POINT_TO_POINT)),
+            qos=_to_enum(_QOS_LEVELS, QoSLevel, data.get("qos", QoSLevel.AT_MOST_ONCE)),
             metadata=data.get("metadata", {})
         )
     
     @classmethod
     def from_json(cls, json_str: str) -> 'MessageEnvelope':
-        """Create from JSON string."""
-        return cls.from_dict(json.loads(json_str))
+        """Create from JSON string (or UTF-8 bytes)."""
+        return cls.from_dict(_json_loads(json_str))
     
     def to_protobuf(self):
-        """Convert to Protobuf message."""
-        import sys
-        from repo_root import get_repo_root
-        # Ensure path is available for import
-        repo_root = get_repo_root()
-        grpc_python_path = str(repo_root / 'grpc' / 'python')
-        if grpc_python_path not in sys.path:
-            sys.path.insert(0, grpc_python_path)
-        try:
-            import messaging_pb2
-        except ImportError:
-            # Fallback if generated file not found (e.g. in tests without build)
+        """Convert to Protobuf message (None if messaging_pb2 is unavailable)."""
+        messaging_pb2 = _load_proto()
+        if messaging_pb2 is None:
             return None
-            
+        
         envelope = messaging_pb2.MessageEnvelope()
         envelope.message_id = self.message_id
         envelope.target = self.target
@@ -148,16 +269,17 @@ class MessageEnvelope:
             message_id=proto.message_id,
             target=proto.target,
             topic=proto.topic,
-            message_type=MessageType(proto.type),
+            message_type=_to_enum(_MESSAGE_TYPES, MessageType, proto.type),
             payload=proto.payload,
             async_flag=getattr(proto, 'async'),
             timestamp=proto.timestamp,
-            routing=RoutingMode(proto.routing),
-            qos=QoSLevel(proto.qos),
+            routing=_to_enum(_ROUTING_MODES, RoutingMode, proto.routing),
+            qos=_to_enum(_QOS_LEVELS, QoSLevel, proto.qos),
             metadata=dict(proto.metadata)
         )
 
 
+@_slotted
 @dataclass
 class Acknowledgment:
     """Acknowledgment message for message delivery confirmation."""
@@ -185,40 +307,29 @@ class Acknowledgment:
         if proto:
             return proto.SerializeToString()
         # Fallback to JSON if proto not available
-        return self.to_json().encode('utf-8')
+        return _json_dumps(self.to_dict())
     
     @classmethod
     def deserialize(cls, data: bytes) -> 'Acknowledgment':
         """Deserialize from bytes (protobuf or JSON fallback)."""
-        try:
+        messaging_pb2 = _load_proto()
+        if messaging_pb2 is not None:
             # Try protobuf first
-            import sys
-            from repo_root import get_repo_root
-            repo_root = get_repo_root()
-            grpc_python_path = str(repo_root / 'grpc' / 'python')
-            if grpc_python_path not in sys.path:
-                sys.path.insert(0, grpc_python_path)
-            import messaging_pb2
-            proto = messaging_pb2.Acknowledgment()
-            proto.ParseFromString(data)
-            return cls.from_protobuf(proto)
-        except Exception:
-            # Fallback to JSON
-            return cls.from_dict(json.loads(data.decode('utf-8')))
+            try:
+                proto = messaging_pb2.Acknowledgment()
+                proto.ParseFromString(data)
+                return cls.from_protobuf(proto)
+            except Exception:
+                pass
+        # Fallback to JSON
+        return cls.from_dict(_json_loads(data))
     
     def to_protobuf(self):
-        """Convert to Protobuf Acknowledgment message."""
-        import sys
-        from repo_root import get_repo_root
-        repo_root = get_repo_root()
-        grpc_python_path = str(repo_root / 'grpc' / 'python')
-        if grpc_python_path not in sys.path:
-            sys.path.insert(0, grpc_python_path)
-        try:
-            import messaging_pb2
-        except ImportError:
+        """Convert to Protobuf Acknowledgment message (None if messaging_pb2 is unavailable)."""
+        messaging_pb2 = _load_proto()
+        if messaging_pb2 is None:
             return None
-            
+        
         ack = messaging_pb2.Acknowledgment()
         ack.original_message_id = self.original_message_id
         ack.received = self.received
@@ -252,11 +363,15 @@ class Acknowledgment:
 class MessagingStats:
     """Statistics collector for messaging performance metrics."""
     
+    __slots__ = ("sent_count", "received_count", "failed_count",
+                 "message_timings", "start_time", "end_time")
+    
     def __init__(self):
         self.sent_count = 0
         self.received_count = 0
         self.failed_count = 0
-        self.message_timings: List[float] = []
+        # Unboxed doubles: 8 bytes per timing instead of a float object each
+        self.message_timings = array.array('d')
         self.start_time = 0
         self.end_time = 0
     
@@ -295,10 +410,16 @@ class MessagingStats:
         }
         
         if timings:
+            if numpy is not None:
+                # Vectorized reductions straight over the array's buffer
+                values = numpy.frombuffer(timings, dtype=numpy.float64)
+                min_ms, max_ms, mean_ms = float(values.min()), float(values.max()), float(values.mean())
+            else:
+                min_ms, max_ms, mean_ms = min(timings), max(timings), sum(timings) / len(timings)
             stats["message_timing_stats"] = {
-                "min_ms": min(timings),
-                "max_ms": max(timings),
-                "mean_ms": sum(timings) / len(timings),
+                "min_ms": min_ms,
+                "max_ms": max_ms,
+                "mean_ms": mean_ms,
                 "count": len(timings)
             }
         
@@ -306,8 +427,29 @@ class MessagingStats:
 
 
 def get_current_time_ms() -> float:
-    """Get current timestamp in milliseconds."""
-    return time.time() * 1000
+    """Get current timestamp in milliseconds (fractional, for duration math)."""
+    return _time_ns() / 1_000_000
+
+
+def get_monotonic_ns() -> int:
+    """Monotonic clock reading in integer nanoseconds, for measuring intervals."""
+    return time.perf_counter_ns()
+
+
+def encode_payload(payload: Any) -> bytes:
+    """Encode a message payload to bytes (dicts as JSON, everything else as text)."""
+    # Checked most frequent first; isinstance against these concrete
+    # builtins is a fast type check, and the three cases are disjoint
+    if isinstance(payload, bytes):
+        return payload
+    elif isinstance(payload, str):
+        return payload.encode('utf-8')
+    elif isinstance(payload, dict):
+        # json.dumps defaults (", " separators, ASCII escapes) are the
+        # payload bytes receivers see, so dicts keep that exact encoding
+        return json.dumps(payload).encode('utf-8')
+    else:
+        return str(payload).encode('utf-8')
 
 
 def create_message_envelope(
@@ -321,20 +463,11 @@ def create_message_envelope(
     metadata: Optional[Dict[str, str]] = None
 ) -> MessageEnvelope:
     """Factory function to create a MessageEnvelope with common defaults."""
-    if isinstance(payload, dict):
-        payload_bytes = json.dumps(payload).encode('utf-8')
-    elif isinstance(payload, str):
-        payload_bytes = payload.encode('utf-8')
-    elif isinstance(payload, bytes):
-        payload_bytes = payload
-    else:
-        payload_bytes = str(payload).encode('utf-8')
-    
     return MessageEnvelope(
         target=target,
         topic=topic,
         message_type=message_type,
-        payload=payload_bytes,
+        payload=encode_payload(payload),
         async_flag=async_flag,
         routing=routing,
         qos=qos,
@@ -342,6 +475,26 @@ def create_message_envelope(
     )
 
 
+def create_data_p2p_envelope(
+    target: int,
+    payload: Any,
+    topic: str = "",
+    metadata: Optional[Dict[str, str]] = None,
+    async_flag: bool = True
+) -> MessageEnvelope:
+    """create_message_envelope specialized for point-to-point data messages.
+    
+    The senders' per-message path always uses DATA_MESSAGE, POINT_TO_POINT and
+    AT_MOST_ONCE, so those are passed positionally as constants, along with a
+    ready id and timestamp for __post_init__ to leave alone.
+    """
+    return MessageEnvelope(
+        next_message_id(), target, topic, MessageType.DATA_MESSAGE,
+        encode_payload(payload), async_flag, _time_ns() // 1_000_000,
+        RoutingMode.POINT_TO_POINT, QoSLevel.AT_MOST_ONCE, metadata or {}
+    )
+
+
 def create_ack(
     original_envelope: MessageEnvelope,
     receiver_id: int,
@@ -372,7 +525,7 @@ def create_ack(
         metadata['reply_to'] = original_envelope.metadata['reply_to']
     
     return MessageEnvelope(
-        message_id=f"ack_{original_envelope.message_id}",
+        message_id=_ACK_PREFIX + original_envelope.message_id,
         target=original_envelope.target,
         message_type=MessageType.ACK,
         payload=ack_payload,  # Protobuf-serialized Acknowledgment
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Redis Helpers - Shared client construction for the Redis Python senders.
+
+Clients get TCP keepalive and larger socket buffers on top of redis-py's
+defaults (which already disable Nagle). redis is imported lazily so this
+module can sit in utils/python without becoming a dependency of the other
+services.
+"""
+import asyncio
+import socket
+import time
+from typing import Any, Dict
+
+REDIS_HOST = 'localhost'
+REDIS_PORT = 6379
+
+# Send/receive buffer size for Redis sockets, so pipelined batches of
+# publishes and bursts of ACKs don't stall on a full socket buffer
+SOCKET_BUFFER_SIZE = 256 * 1024
+
+# How long a sender waits for every target channel to have a subscriber
+READY_TIMEOUT_S = 5.0
+
+# Pause between PUBSUB NUMSUB polls while waiting for receivers
+READY_POLL_S = 0.005
+
+# Keepalive probing; the per-option constants are Linux-only
+KEEPALIVE_OPTIONS = {
+    getattr(socket, name): value
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 10), ('TCP_KEEPCNT', 3))
+    if hasattr(socket, name)
+}
+
+
+def connection_kwargs(**overrides) -> Dict[str, Any]:
+    """Connection pool arguments shared by the sync and async senders."""
+    kwargs = {
+        'host': REDIS_HOST,
+        'port': REDIS_PORT,
+        'db': 0,
+        'socket_keepalive': True,
+        'socket_keepalive_options': KEEPALIVE_OPTIONS,
+    }
+    kwargs.update(overrides)
+    return kwargs
+
+
+def tune_socket(sock) -> None:
+    """Apply the latency/buffer socket options to a connected Redis socket."""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+
+
+def make_redis(**overrides):
+    """Create a sync redis.Redis client whose connections use tuned sockets."""
+    import redis
+    from redis.connection import DefaultParser
+
+    class TunedConnection(redis.Connection):
+        def _connect(self):
+            sock = super()._connect()
+            tune_socket(sock)
+            return sock
+
+    kwargs = connection_kwargs(**overrides)
+    # DefaultParser is the hiredis C parser whenever hiredis is installed
+    kwargs.setdefault('parser_class', DefaultParser)
+    pool = redis.ConnectionPool(connection_class=TunedConnection, **kwargs)
+    return redis.Redis(connection_pool=pool)
+
+
+def make_async_pool(**overrides):
+    """Create a redis.asyncio connection pool whose connections use tuned sockets."""
+    import redis.asyncio
+    from redis.asyncio.connection import DefaultParser
+
+    class TunedConnection(redis.asyncio.Connection):
+        async def _connect(self):
+            await super()._connect()
+            sock = self._writer.transport.get_extra_info('socket')
+            if sock is not None:
+                tune_socket(sock)
+
+    kwargs = connection_kwargs(**overrides)
+    kwargs.setdefault('parser_class', DefaultParser)
+    return redis.asyncio.ConnectionPool(connection_class=TunedConnection, **kwargs)
+
+
+def parser_name(pool) -> str:
+    """Name of the RESP parser class a pool's connections use, for startup logs."""
+    return pool.connection_kwargs['parser_class'].__name__
+
+
+def _unsubscribed(counts):
+    return [channel for channel, count in counts if count == 0]
+
+
+def wait_for_subscribers(r, channels, timeout: float = READY_TIMEOUT_S) -> list:
+    """Block until every channel has a subscriber or timeout passes.
+    
+    Redis pub/sub drops messages nobody is subscribed to, so senders check
+    readiness once up front instead of retrying publishes. Returns the
+    channels still without a subscriber.
+    """
+    deadline = time.monotonic() + timeout
+    missing = _unsubscribed(r.pubsub_numsub(*channels))
+    while missing and time.monotonic() < deadline:
+        time.sleep(READY_POLL_S)
+        missing = _unsubscribed(r.pubsub_numsub(*missing))
+    return missing
+
+
+async def async_wait_for_subscribers(r, channels, timeout: float = READY_TIMEOUT_S) -> list:
+    """Async variant of wait_for_subscribers for redis.asyncio clients."""
+    deadline = time.monotonic() + timeout
+    missing = _unsubscribed(await r.pubsub_numsub(*channels))
+    while missing and time.monotonic() < deadline:
+        await asyncio.sleep(READY_POLL_S)
+        missing = _unsubscribed(await r.pubsub_numsub(*missing))
+    return missing
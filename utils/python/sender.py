@@ -86,11 +86,12 @@ class UnifiedSender(ABC):
             metadata=metadata
         )
         
-        msg_start = get_current_time_ms()
+        # Latency is a monotonic integer-ns delta, immune to wall-clock steps
+        msg_start = time.perf_counter_ns()
         
         if wait_for_ack:
             response = self._send_with_ack(envelope, timeout_ms)
-            latency_ms = get_current_time_ms() - msg_start
+            latency_ms = (time.perf_counter_ns() - msg_start) / 1_000_000
             
             if response and response.message_type == MessageType.ACK:
                 # Parse ACK payload using protobuf deserialization
@@ -134,7 +135,7 @@ class UnifiedSender(ABC):
         else:
             # Fire and forget
             success = self._send_raw(envelope)
-            latency_ms = get_current_time_ms() - msg_start
+            latency_ms = (time.perf_counter_ns() - msg_start) / 1_000_000
             # Stats are recorded by caller (run_performance_test)
             return SendResult(
                 success=success,
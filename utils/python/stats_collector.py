@@ -3,9 +3,19 @@
 Stats Collector - Performance metrics collection for all services.
 Provides compatibility with legacy tests using MessageStats class.
 """
+import os
 import time
 import json
-from typing import Dict, Any, List
+import array
+from typing import Dict, Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Sender report file, relative to the harness working directory
+REPORT_FILE = 'logs/report.txt'
 
 # Try to import MessagingStats from messaging, but fallback if not found
 try:
@@ -20,7 +30,7 @@ except ImportError:
             self.sent_count = 0
             self.received_count = 0
             self.failed_count = 0
-            self.message_timings: List[float] = []
+            self.message_timings = array.array('d')
             self.start_time = 0
             self.end_time = 0
             self.metadata: Dict[str, Any] = {}
@@ -74,6 +84,10 @@ class MessageStats(BaseStats):
     def record_message(self, success: bool, timing_ms: float = 0.0):
         """Map record_message (C++ style) to record_send (Unified style)."""
         self.record_send(success, timing_ms)
+    
+    def record_message_ns(self, success: bool, elapsed_ns: int = 0):
+        """Record a message timed with time.perf_counter_ns() deltas."""
+        self.record_send(success, elapsed_ns / 1_000_000)
         
     def set_metadata(self, metadata: Dict[str, Any]):
         """Set metadata for reporting."""
@@ -82,3 +96,16 @@ class MessageStats(BaseStats):
 def get_current_time_ms_static() -> float:
     """Static helper for time."""
     return time.time() * 1000
+
+
+def write_report(report: Dict[str, Any], path: str = REPORT_FILE):
+    """Append a report as one JSON line using a single O_APPEND write()."""
+    if orjson is not None:
+        line = orjson.dumps(report) + b'\n'
+    else:
+        line = (json.dumps(report) + '\n').encode()
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
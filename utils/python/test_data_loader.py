@@ -11,11 +11,26 @@ import os
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # Default test data file name
 DEFAULT_TEST_DATA_FILE = "test_data.json"
 
 
+def _parse_json_file(path: Path) -> Any:
+    """Parse a JSON file, using orjson's C parser when it is installed."""
+    with open(path, 'rb') as f:
+        content = f.read()
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(content)
+    return json.loads(content)
+
+
 def get_default_test_data_path() -> Path:
     """
     Get the default path to test_data.json by searching common locations.
@@ -113,10 +128,7 @@ def load_test_data(data_path: Optional[str] = None) -> List[Dict[str, Any]]:
     try:
         resolved_path = resolve_test_data_path(data_path)
         
-        with open(resolved_path, 'r') as f:
-            test_data = json.load(f)
-        
-        return test_data
+        return _parse_json_file(resolved_path)
     
     except json.JSONDecodeError as e:
         raise json.JSONDecodeError(
@@ -148,12 +160,7 @@ def get_test_data_count(data_path: Optional[str] = None) -> int:
     """
     resolved_path = resolve_test_data_path(data_path)
     
-    with open(resolved_path, 'r') as f:
-        # Read just enough to count the top-level array
-        content = f.read()
-        data = json.loads(content)
-    
-    return len(data)
+    return len(_parse_json_file(resolved_path))
 
 
 def validate_test_data(test_data: List[Dict[str, Any]]) -> tuple[bool, List[str]]: